@@ -277,6 +277,14 @@ def fetch_article_text(url: str) -> str:
         return ""
 
 
+def slugify(url_or_title: str) -> str:
+    """Turn a link or title into a short filesystem-friendly slug for the MP3 name."""
+    base = url_or_title.strip()
+    base = re.sub(r"https?://", "", base)
+    base = re.sub(r"[^a-zA-Z0-9]+", "-", base.lower()).strip("-")
+    return base[:120] or "article"
+
+
 def text_to_html(text: str) -> str:
     """Rebuild simple HTML paragraphs from the normalized article text."""
     if not text:
@@ -0,0 +1,60 @@
+"""urllib3 retry policy shared by the pipeline's pooled HTTP adapters."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Self
+
+from urllib3.util.retry import Retry
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from urllib3.connectionpool import ConnectionPool
+    from urllib3.response import BaseHTTPResponse
+
+# Longest single wait between adapter retries, from backoff or from Retry-After.
+RETRY_BACKOFF_MAX_S = 30.0
+
+
+class CappedRetry(Retry):
+    """urllib3 Retry that caps every wait at backoff_max and prints each retry.
+
+    Inputs: the usual Retry arguments; backoff_max bounds both the exponential
+    backoff and any server-sent Retry-After.
+    Outputs: Retry objects that urllib3 replays on the adapter's connection pool.
+    Edge cases: stock urllib3 sleeps for whatever Retry-After asks (an hour is
+    legal) without any output, which stalls a run silently; here the header is
+    clamped and every replay is announced with its cause and wait. Exhausted
+    retries print nothing extra, the caller sees the final response or error.
+    """
+
+    def get_retry_after(self, response: BaseHTTPResponse) -> float | None:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.backoff_max)
+
+    def increment(
+        self,
+        method: str | None = None,
+        url: str | None = None,
+        response: BaseHTTPResponse | None = None,
+        error: Exception | None = None,
+        _pool: ConnectionPool | None = None,
+        _stacktrace: TracebackType | None = None,
+    ) -> Self:
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        wait = None
+        if response is not None and self.respect_retry_after_header:
+            wait = new_retry.get_retry_after(response)
+        if wait is None:
+            wait = new_retry.get_backoff_time()
+        cause = f"status {response.status}" if response is not None else repr(error)
+        host = getattr(_pool, "host", "") or ""
+        print(
+            f"[http] {method} {host}{url or ''} failed with {cause}; "
+            f"retry {len(new_retry.history)} in {wait:.1f}s "
+            f"({new_retry.total} left)",
+            flush=True,
+        )
+        return new_retry
@@ -0,0 +1,67 @@
+"""Fast JSON helpers shared by the pipeline scripts (orjson with a stdlib fallback)."""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+try:  # Pinned in requirements.txt; the stdlib path keeps minimal test envs working
+    import orjson
+except ImportError:  # pragma: no cover - best effort import
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON from raw bytes or text without an extra decode step."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: object, *, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes.
+
+    Inputs: JSON-compatible object; indent=True for 2-space pretty output; sort_keys
+    for byte-stable output across runs.
+    Outputs: UTF-8 bytes with non-ASCII text kept verbatim (like ensure_ascii=False).
+    Edge cases: non-string dict keys are stringified by both backends.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+    ).encode("utf-8")
+
+
+def write_json_atomic(
+    path: str | os.PathLike[str], obj: object, *, indent: bool = False
+) -> None:
+    """Write obj as JSON to path via a sibling temp file and os.replace.
+
+    Inputs: destination path, JSON-compatible object, indent flag as for dumps().
+    Outputs: None; path holds the complete document once this returns.
+    Edge cases: readers never see a partially written file; the temp file is
+    removed if serialization or the write fails.
+    """
+    target = os.fspath(path)
+    tmp = f"{target}.tmp"
+    try:
+        with open(tmp, "wb") as handle:
+            handle.write(dumps(obj, indent=indent))
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
@@ -7,11 +7,9 @@ import datetime
 import gzip
 import html
 import io
-import json
 import os
 import pathlib
 import re
-import sys
 from types import SimpleNamespace
 from typing import Any, Callable, Mapping, Protocol, Sequence, TypedDict
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
@@ -21,7 +19,8 @@ import requests
 from google.cloud import texttospeech
 from pydub import AudioSegment, effects
 
-from content_utils import resolve_article_content, text_to_html
+import json_utils
+from content_utils import resolve_article_content, slugify, text_to_html
 
 
 class EntryMeta(TypedDict):
@@ -51,6 +50,7 @@ class SidecarPayload(TypedDict):
     article_image_url: str
     mp3_filename: str
     mp3_local_path: str
+    audio_bytes: int
     tts_characters: int
     tts_generated: bool
 
@@ -431,14 +431,6 @@ def _dump_rss_debug(rss_url: str, *, payload: bytes | None = None) -> None:
         print("RSS debug: payload looks like HTML, not RSS")
 
 
-def slugify(url_or_title: str) -> str:
-    """Turn a link or title into a short filesystem-friendly slug for the MP3 name."""
-    base = url_or_title.strip()
-    base = re.sub(r"https?://", "", base)
-    base = re.sub(r"[^a-zA-Z0-9]+", "-", base.lower()).strip("-")
-    return base[:120] or "article"
-
-
 def feed_entry_to_meta(e: object, *, allow_fetch: bool = False) -> EntryMeta:
     """Expand a feed entry into EntryMeta so downstream SSML rendering has clean data."""
     link_source = getattr(e, "link", None) or getattr(e, "id", None)
@@ -482,7 +474,9 @@ def feed_entry_to_meta(e: object, *, allow_fetch: bool = False) -> EntryMeta:
     )
 
 
-def select_entry() -> EntryMeta:
+def select_entry(
+    target_link: str = TARGET_LINK, target_id: str = TARGET_ID
+) -> EntryMeta:
     """Pick the requested feed entry (or the latest) as the base article for the episode."""
     try:
         parsed_source = _parse_rss_source(RSS_URL)
@@ -502,15 +496,15 @@ def select_entry() -> EntryMeta:
         """Check whether the feed entry matches the CLI-supplied target filters."""
         link = _ensure_str(getattr(entry, "link", None))
         entry_id = _ensure_str(getattr(entry, "id", None))
-        if TARGET_LINK and link == TARGET_LINK:
+        if target_link and link == target_link:
             return True
-        if TARGET_ID and entry_id == TARGET_ID:
+        if target_id and entry_id == target_id:
             return True
         return False
 
     target = next((entry for entry in entries if matches_target(entry)), None)
     if not target:
-        if TARGET_LINK or TARGET_ID:
+        if target_link or target_id:
             print("Target entry not found in feed - falling back to latest")
         target = entries[0]
     return feed_entry_to_meta(target, allow_fetch=True)
@@ -639,7 +633,7 @@ def render_ssml(meta: EntryMeta) -> tuple[list[str], int]:
 
 
 def synthesize_ssml(ssml_segments: Sequence[str], out_path: pathlib.Path) -> None:
-    """Send the SSML segments to Google, stitch the MP3s, and write the output for downstream steps."""
+    """Send the SSML segments to Google, stitch and normalize the MP3s, and write the output."""
     client: _TTSClient = texttospeech.TextToSpeechClient()
     name = VOICE
     lang = LANG
@@ -675,24 +669,24 @@ def synthesize_ssml(ssml_segments: Sequence[str], out_path: pathlib.Path) -> Non
     out_path.parent.mkdir(parents=True, exist_ok=True)
     if combined_audio is None:
         raise RuntimeError("TTS synthesis produced no audio segments")
-    combined_audio.export(out_path, format="mp3")
+    # Normalize loudness in memory so the MP3 is encoded and written exactly once.
+    effects.normalize(combined_audio).export(out_path, format="mp3")
     print(f"Voice: {name}  Lang: {lang}")
 
 
-def normalize_mp3(path: pathlib.Path) -> None:
-    """Run loudness normalization right after synthesis so the finished MP3 sounds consistent."""
-    audio = AudioSegment.from_file(path)
-    audio = effects.normalize(audio)
-    audio.export(path, format="mp3")
+def run(target_link: str = "", target_id: str = "") -> pathlib.Path:
+    """Select an article, render SSML, and build the MP3 plus its sidecar.
 
-
-def main() -> None:
-    """Drive the whole flow: select an article, render SSML, build MP3 + sidecar."""
+    Inputs: optional feed entry link or id to synthesize (latest entry otherwise).
+    Outputs: path of the written ``.mp3.rssmeta.json`` sidecar.
+    Edge cases: reuses an existing MP3 without calling TTS; raises SystemExit for
+    unusable RSS sources so in-process callers can record the failure.
+    """
     if not RSS_URL:
-        sys.exit("Missing RSS_URL")
+        raise SystemExit("Missing RSS_URL")
 
     print(f"RSS source (RSS_URL): {_describe_rss_source(RSS_URL)}")
-    e = select_entry()
+    e = select_entry(target_link, target_id)
     # filename: <YYYYMMDD-HHMMSS>-<slug(title or path)>
     dt = datetime.datetime.fromisoformat(
         e["pub_utc"].replace("Z", "+00:00")
@@ -709,7 +703,6 @@ def main() -> None:
         print(f"Exists, skipping TTS: {mp3_path}")
     else:
         synthesize_ssml(ssml_segments, mp3_path)
-        normalize_mp3(mp3_path)
         print(f"Wrote {mp3_path}")
         generated = True
         print(f"Characters billed (approx): {char_count}")
@@ -727,11 +720,17 @@ def main() -> None:
         "article_image_url": e.get("article_image_url", ""),
         "mp3_filename": mp3_name,
         "mp3_local_path": str(mp3_path),
+        "audio_bytes": mp3_path.stat().st_size,
         "tts_characters": char_count,
         "tts_generated": generated,
     }
-    with sidecar.open("w", encoding="utf-8") as f:
-        json.dump(side, f, ensure_ascii=False, indent=2)
+    json_utils.write_json_atomic(sidecar, side, indent=True)
+    return sidecar
+
+
+def main() -> None:
+    """CLI entry point: build one episode for TARGET_ENTRY_LINK/ID (or the latest)."""
+    sidecar = run(TARGET_LINK, TARGET_ID)
     print(f"Sidecar: {sidecar}")
 
 
@@ -4,10 +4,10 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import hashlib
 import html
 import importlib
-import json
 import os
 import pathlib
 import re
@@ -16,13 +16,17 @@ import shutil
 import subprocess  # nosec B404
 import sys
 import tempfile
+import threading
 import time
 import io
-from collections.abc import Mapping
+import operator
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Protocol, TypedDict, cast
 from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
     stdout = sys.stdout
@@ -31,13 +35,19 @@ try:
 except Exception:
     stdout = sys.stdout
 
+import json_utils
 from content_utils import resolve_article_content, text_to_html
+from http_retry import RETRY_BACKOFF_MAX_S, CappedRetry
 
 StrPath = str | os.PathLike[str]
 JSONDict = dict[str, Any]
 EntryDict = dict[str, Any]
 StateItems = dict[str, JSONDict]
 
+_UTC = datetime.timezone.utc
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+
 
 class FeedParserDict(dict[str, Any]):
     """Narrow type so the pipeline knows feedparser returns an object with entries."""
@@ -90,6 +100,10 @@ class FeedparserModule(Protocol):
 _feedparser_module: FeedparserModule | None = None
 
 
+class FeedNotModified(Exception):
+    """Raised when the source feed answers a conditional GET with 304 Not Modified."""
+
+
 def _get_feedparser() -> FeedparserModule:
     """Lazy-load feedparser so short-lived CLI invocations stay snappy."""
     global _feedparser_module
@@ -102,23 +116,36 @@ def _get_feedparser() -> FeedparserModule:
 def _fetch_rss_payload(
     rss_url: str,
     *,
-    http_get: Any = requests.get,
-) -> tuple[bytes | None, str | None]:
+    http_get: Any | None = None,
+    request_validators: Mapping[str, str] | None = None,
+) -> tuple[bytes | None, str | None, dict[str, str]]:
     """Fetch RSS payload over HTTP(S) and classify common CDN/origin failures.
 
-    Inputs: rss_url from RSS_URL and an injectable http_get for testing.
-    Outputs: (payload bytes, error message) where payload is None on failure.
-    Edge cases: non-HTTP URLs, timeouts, Cloudflare status codes, or unknown 4xx/5xx.
+    Inputs: rss_url from RSS_URL, an injectable http_get for testing (defaults to a
+    plain requests.get without adapter retries), and optional ETag/Last-Modified validators from the previous
+    clean run.
+    Outputs: (payload bytes, error message, response validators) where payload is None
+    on failure and validators holds the ETag/Last-Modified of a successful response.
+    Edge cases: non-HTTP URLs, timeouts, Cloudflare status codes, or unknown 4xx/5xx;
+    raises FeedNotModified when the origin answers 304 to the conditional request.
     """
     if not rss_url.startswith(("http://", "https://")):
-        return None, None
+        return None, None, {}
     headers = {
         "User-Agent": RSS_HTTP_USER_AGENT,
         "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8",
     }
+    if request_validators:
+        if request_validators.get("etag"):
+            headers["If-None-Match"] = request_validators["etag"]
+        if request_validators.get("last_modified"):
+            headers["If-Modified-Since"] = request_validators["last_modified"]
     source_feed_context = f"source RSS feed '{rss_url}'"
+    # Not _SESSION: its adapter retries read timeouts, 524s and waits out Retry-After
+    # (up to 30s), which would stretch one failed feed fetch far past the timeouts.
+    request_get = http_get or requests.get
     try:
-        response = http_get(
+        response = request_get(
             rss_url,
             headers=headers,
             timeout=(RSS_HTTP_CONNECT_TIMEOUT_S, RSS_HTTP_READ_TIMEOUT_S),
@@ -128,9 +155,10 @@ def _fetch_rss_payload(
             None,
             f"Failed to fetch {source_feed_context}: request timed out while waiting for the "
             "origin server response.",
+            {},
         )
     except requests.RequestException as exc:
-        return None, f"Failed to fetch {source_feed_context} before parsing: {exc}"
+        return None, f"Failed to fetch {source_feed_context} before parsing: {exc}", {}
 
     status_code = response.status_code
     server_header = (response.headers.get("server") or "").lower()
@@ -140,15 +168,24 @@ def _fetch_rss_payload(
         return (
             None,
             f"Failed to fetch {source_feed_context}: Cloudflare {status_code} (origin error).",
+            {},
         )
     if status_code in RSS_HTTP_BLOCK_STATUS_CODES and is_cloudflare:
         return (
             None,
             f"Failed to fetch {source_feed_context}: blocked at Cloudflare (HTTP {status_code}).",
+            {},
         )
+    if status_code == 304 and request_validators:
+        raise FeedNotModified(rss_url)
     if status_code >= 400:
-        return None, f"Failed to fetch {source_feed_context}: HTTP {status_code}."
-    return response.content, None
+        return None, f"Failed to fetch {source_feed_context}: HTTP {status_code}.", {}
+    validators = {
+        key: header_value
+        for key, header_name in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if (header_value := response.headers.get(header_name))
+    }
+    return response.content, None, validators
 
 
 def _payload_looks_like_html(payload: bytes) -> bool:
@@ -212,8 +249,32 @@ def _strip_html_tags(html_value: str) -> str:
 
     if not html_value:
         return ""
-    text_without_tags = re.sub(r"<[^>]+>", " ", html_value)
-    return re.sub(r"\s+", " ", html.unescape(text_without_tags)).strip()
+    text_without_tags = _HTML_TAG_RE.sub(" ", html_value)
+    return _WHITESPACE_RUN_RE.sub(" ", html.unescape(text_without_tags)).strip()
+
+
+@functools.lru_cache(maxsize=1024)
+def _estimate_tts_characters(title: str, subtitle: str, summary: str) -> int:
+    """Count billable characters for an entry's title, subtitle and summary.
+
+    Inputs: plain-text title and subtitle plus the (possibly HTML) summary.
+    Outputs: length of the tag-stripped, newline-joined text.
+    Edge cases: results are cached because the same entry is estimated from several
+    branches of the pipeline loop and again on each rescan within a process.
+    """
+
+    summary_clean = _HTML_TAG_RE.sub("", summary) if "<" in summary else summary
+    plain = "\n".join([p for p in (title, subtitle, summary_clean) if p]).strip()
+    return len(plain)
+
+
+def estimate_characters(meta_like: Mapping[str, Any]) -> int:
+    """Approximate characters for billing before we run expensive TTS work."""
+    return _estimate_tts_characters(
+        str(meta_like.get("article_title", "")),
+        str(meta_like.get("article_subtitle") or ""),
+        str(meta_like.get("article_summary") or ""),
+    )
 
 
 def _to_mapping(value: object) -> Mapping[str, Any]:
@@ -377,19 +438,82 @@ PUBLIC = (ROOT / "public").resolve()
 
 WRANGLER_BINARY_NAME = "wrangler"
 LOCAL_WRANGLER_PATH = (ROOT / "node_modules" / ".bin" / WRANGLER_BINARY_NAME).resolve()
+PAGES_DEPLOY_DIR = "public"
+LAST_DEPLOYED_HASH_KEY = "last_deployed_hash"
+RSS_VALIDATORS_KEY = "rss_validators"
+# Stored next to the validators: identifiers of the feed they describe.
+RSS_VALIDATORS_IDENTIFIERS_KEY = "identifiers"
 _has_warned_about_global_wrangler_fallback = False
 
-PY = sys.executable
-
 # Cloudflare vars
 CF_ACCOUNT_ID = os.getenv("CLOUDFLARE_ACCOUNT_ID", "").strip()
 CF_API_TOKEN = os.getenv("CLOUDFLARE_API_TOKEN", "").strip()
 CF_PAGES_PROJECT = os.getenv("CF_PAGES_PROJECT", "tts-podcast-feeds").strip()
 CF_KV_NAMESPACE_NAME = os.getenv("CF_KV_NAMESPACE_NAME", "tts-podcast-state").strip()
+CF_AUTH_HEADERS = {"Authorization": f"Bearer {CF_API_TOKEN}"}
+# Stored entry failures batched per KV write; published episodes are written at once.
+KV_FLUSH_EVERY_ENTRIES = 5
+# Per-entry states kept in KV; older ones outside the source feed are pruned.
+STATE_MAX_ITEMS = 500
 _cf_kv_namespace_id = os.getenv("CF_KV_NAMESPACE_ID", "").strip()
+# Digest of the body last read from / written to each KV key in this process.
+_kv_stored_digests: dict[str, str] = {}
+
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504, 524)
+
+
+def _build_http_session() -> requests.Session:
+    """Create a pooled HTTP session for the KV and Internet Archive helpers.
+
+    Inputs: none.
+    Outputs: session with keep-alive connection pools and urllib3 retries for reads.
+    Edge cases: each retry is printed, and no single wait (backoff or Retry-After)
+    exceeds RETRY_BACKOFF_MAX_S, so a throttled Cloudflare or archive.org response
+    cannot park kv_get or the IA probe threads silently. Only GET/HEAD are retried
+    by the adapter; kv_put keeps its own escalating-timeout loop and namespace
+    creation (POST) must not be replayed. No auth header is set on the session
+    because the same pools also talk to archive.org.
+    requests sessions are not thread-safe, so _SESSION stays on the main thread and
+    worker threads get their own via _thread_http_session().
+    """
+    retry = CappedRetry(
+        total=5,
+        backoff_factor=0.5,
+        backoff_max=RETRY_BACKOFF_MAX_S,
+        status_forcelist=HTTP_RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    # A handful of hosts per session (Cloudflare API, archive.org).
+    adapter = HTTPAdapter(pool_connections=4, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_SESSION = _build_http_session()
+_thread_sessions = threading.local()
+
+
+def _thread_http_session() -> requests.Session:
+    """Return the calling worker thread's own pooled HTTP session.
+
+    Inputs: none.
+    Outputs: a session built by _build_http_session, created on first use per thread.
+    Edge cases: the session lives as long as its thread, so each IA probe worker
+    reuses its connection across the identifiers it handles.
+    """
+    session = getattr(_thread_sessions, "session", None)
+    if session is None:
+        session = _build_http_session()
+        _thread_sessions.session = session
+    return session
+
 
 SLUG = os.getenv("PODCAST_SLUG", "default").strip()
 IA_ID_PREFIX = os.getenv("IA_ID_PREFIX", SLUG).strip() or SLUG
+IA_PROBE_MAX_WORKERS = 8
 RSS_URL = os.getenv("RSS_URL", "").strip()
 WORDPRESS_POSTS_API_URL = os.getenv("WORDPRESS_POSTS_API_URL", "").strip()
 RSS_HTTP_USER_AGENT = "tts-podcast-rss-fetcher/1.0"
@@ -787,9 +911,8 @@ def ensure_kv_namespace_id() -> str:
     global _cf_kv_namespace_id
     if _cf_kv_namespace_id:
         return _cf_kv_namespace_id
-    headers = {"Authorization": f"Bearer {CF_API_TOKEN}"}
     # list
-    r = requests.get(_kv_base(), headers=headers, timeout=15)
+    r = _SESSION.get(_kv_base(), headers=CF_AUTH_HEADERS, timeout=15)
     if r.ok:
         for ns in r.json().get("result", []):
             if ns.get("title") == CF_KV_NAMESPACE_NAME:
@@ -799,8 +922,11 @@ def ensure_kv_namespace_id() -> str:
                 )
                 return _cf_kv_namespace_id
     # create
-    r = requests.post(
-        _kv_base(), headers=headers, json={"title": CF_KV_NAMESPACE_NAME}, timeout=15
+    r = _SESSION.post(
+        _kv_base(),
+        headers=CF_AUTH_HEADERS,
+        json={"title": CF_KV_NAMESPACE_NAME},
+        timeout=15,
     )
     if not r.ok:
         raise SystemExit(
@@ -816,14 +942,19 @@ def kv_url(key: str) -> str:
     return f"{_kv_base()}/{ensure_kv_namespace_id()}/values/{key}"
 
 
+def _kv_digest(body: bytes) -> str:
+    """Fingerprint a canonical KV body; blake2b is plenty for change detection."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
 def kv_get(key: str) -> JSONDict | None:
     """Read JSON pipeline state for the feed from Cloudflare KV."""
     try:
-        r = requests.get(
-            kv_url(key), headers={"Authorization": f"Bearer {CF_API_TOKEN}"}, timeout=15
-        )
+        r = _SESSION.get(kv_url(key), headers=CF_AUTH_HEADERS, timeout=15)
         if r.status_code == 200:
-            return json.loads(r.text) if r.text else {}
+            data = json_utils.loads(r.content) if r.content else {}
+            _kv_stored_digests[key] = _kv_digest(json_utils.dumps(data, sort_keys=True))
+            return data
         if r.status_code == 404:
             return None
         print(f"[kv] GET {key} -> {r.status_code}")
@@ -841,11 +972,9 @@ def kv_put_via_wrangler(key: str, data: JSONDict) -> bool:
 
     tmp_path: str | None = None
     try:
-        tmp = tempfile.NamedTemporaryFile(
-            "w", delete=False, suffix=".json", encoding="utf-8"
-        )
+        tmp = tempfile.NamedTemporaryFile("wb", delete=False, suffix=".json")
         with tmp:
-            json.dump(data, tmp, ensure_ascii=False)
+            tmp.write(json_utils.dumps(data))
             tmp_path = tmp.name
 
         ns_id = ensure_kv_namespace_id()
@@ -882,23 +1011,26 @@ def kv_put_via_wrangler(key: str, data: JSONDict) -> bool:
 
 def kv_put(key: str, data: JSONDict) -> bool:
     """Store mutable pipeline state back into Cloudflare KV with simple retries/backoff, then wrangler fallback."""
+    body = json_utils.dumps(data, sort_keys=True)
+    digest = _kv_digest(body)
+    if _kv_stored_digests.get(key) == digest:
+        print(f"[kv] PUT {key} skipped (unchanged)")
+        return True
     attempts = 4
     backoff_s = 2.0
     base_timeout = 15.0
     for attempt in range(1, attempts + 1):
         try:
             timeout = base_timeout * (2 ** (attempt - 1))
-            r = requests.put(
+            r = _SESSION.put(
                 kv_url(key),
-                headers={
-                    "Authorization": f"Bearer {CF_API_TOKEN}",
-                    "Content-Type": "application/json",
-                },
-                data=json.dumps(data, ensure_ascii=False),
+                headers={**CF_AUTH_HEADERS, "Content-Type": "application/json"},
+                data=body,
                 timeout=timeout,
             )
             if r.status_code in (200, 204):
                 print(f"[kv] PUT {key} ok (attempt {attempt}, timeout={timeout}s)")
+                _kv_stored_digests[key] = digest
                 return True
             print(f"[kv] PUT {key} -> {r.status_code} {r.text[:200]}")
         except Exception as e:
@@ -912,7 +1044,10 @@ def kv_put(key: str, data: JSONDict) -> bool:
             time.sleep(delay)
 
     # Last-resort fallback via wrangler CLI (uses local auth config / env)
-    return kv_put_via_wrangler(key, data)
+    if kv_put_via_wrangler(key, data):
+        _kv_stored_digests[key] = digest
+        return True
+    return False
 
 
 def kv_put_or_die(key: str, data: JSONDict) -> None:
@@ -923,47 +1058,89 @@ def kv_put_or_die(key: str, data: JSONDict) -> None:
 
 
 # ---------- IA helpers ----------
+@functools.lru_cache(maxsize=4096)
 def link_hash(link: str) -> str:
     """Return a stable short hash used anywhere we need deterministic filenames."""
     return hashlib.sha1(link.encode("utf-8"), usedforsecurity=False).hexdigest()
 
 
+@functools.lru_cache(maxsize=4096)
 def ia_identifier_for_link(link: str) -> str:
     """Namespace the link hash so uploads land under unique IA identifiers."""
     return f"tts-{IA_ID_PREFIX}-{link_hash(link)[:16]}"
 
 
 def ia_has_episode_http(identifier: str) -> bool:
-    """Quickly check whether IA already hosts audio for this entry."""
+    """Quickly check whether IA already hosts audio for this entry.
+
+    Inputs: IA identifier derived from the article link.
+    Outputs: True when the download URL resolves to a 200 after redirects.
+    Edge cases: a redirect alone is not proof, since the storage node it points to
+    can still fail (item dark, file missing); network errors count as "not present".
+    """
     url = f"https://archive.org/download/{identifier}/episode.mp3"
     try:
-        r = requests.head(url, allow_redirects=True, timeout=10)
+        r = _thread_http_session().head(url, allow_redirects=True, timeout=10)
         return r.status_code == 200
     except Exception:
         return False
 
 
+def _state_proves_published(
+    entry_state: Mapping[str, Any] | None, entry_pub_utc: str
+) -> bool:
+    """Return True when stored state already shows this exact entry as published.
+
+    Inputs: per-entry KV state (or None) and the feed entry's publication timestamp.
+    Outputs: True if the audio was uploaded and added to the feed for that pub date.
+    Edge cases: a changed pub date or missing uploaded_url means IA must be checked.
+    """
+    return bool(
+        entry_state
+        and entry_state.get("rss_added")
+        and entry_state.get("uploaded_url")
+        and entry_state.get("last_pub_utc") == entry_pub_utc
+    )
+
+
+def _probe_ia_presence(identifiers: Iterable[str]) -> dict[str, bool]:
+    """Run the IA HEAD probes for a batch of identifiers concurrently.
+
+    Inputs: IA identifiers for the entries this run is about to inspect.
+    Outputs: mapping of identifier -> whether IA already serves its episode MP3.
+    Edge cases: duplicates are probed once; an empty batch starts no threads.
+    """
+    unique_ids = list(dict.fromkeys(identifiers))
+    if not unique_ids:
+        return {}
+    workers = min(IA_PROBE_MAX_WORKERS, len(unique_ids))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(unique_ids, executor.map(ia_has_episode_http, unique_ids)))
+
+
 # ---------- RSS fetch helpers ----------
-def _entry_from_feed(e: Any) -> EntryDict:
-    """Map feedparser entries to the schema expected by the rest of the pipeline."""
-    link = getattr(e, "link", None) or getattr(e, "id", None)
-    title = getattr(e, "title", link)
+def _entry_from_feed(e: Any, *, fallback_pub_utc: str | None = None) -> EntryDict:
+    """Map feedparser entries to the schema expected by the rest of the pipeline.
+
+    ``fallback_pub_utc`` lets a caller share one "now" timestamp across all entries
+    that have no published/updated date.
+    """
+    # FeedParserDict resolves aliases in get(); plain lookups skip __getattr__ fallbacks.
+    ge = e.get
+    link = ge("link") or ge("id")
+    title = ge("title", link)
     plain_text, html_content, subtitle, lead_image = resolve_article_content(
         e, link, allow_fetch=False
     )
-    summary = (
-        plain_text or getattr(e, "summary", "") or getattr(e, "description", "") or ""
-    )
+    summary = plain_text or ge("summary") or ge("description") or ""
     if not html_content and summary:
         html_content = text_to_html(summary)
-    tstruct = getattr(e, "published_parsed", None) or getattr(e, "updated_parsed", None)
+    tstruct = ge("published_parsed") or ge("updated_parsed")
     if tstruct:
-        pub_utc = datetime.datetime(
-            *tstruct[:6], tzinfo=datetime.timezone.utc
-        ).isoformat()
+        pub_utc = datetime.datetime(*tstruct[:6], tzinfo=_UTC).isoformat()
     else:
-        pub_utc = datetime.datetime.now(datetime.timezone.utc).isoformat()
-    author = getattr(e, "author", "") or getattr(e, "creator", "") or ""
+        pub_utc = fallback_pub_utc or datetime.datetime.now(_UTC).isoformat()
+    author = ge("author") or ge("creator") or ""
     return {
         "article_title": title,
         "article_summary": summary,
@@ -976,10 +1153,36 @@ def _entry_from_feed(e: Any) -> EntryDict:
     }
 
 
-def fetch_entries_from_rss(limit: int | None = None) -> list[EntryDict]:
-    """Pull entries from the configured RSS feed so we know what to process."""
+def fetch_entries_from_rss(
+    limit: int | None = None,
+    *,
+    request_validators: Mapping[str, str] | None = None,
+) -> list[EntryDict]:
+    """Pull entries from the configured RSS feed so we know what to process.
+
+    Passing ``request_validators`` makes the fetch conditional; an unchanged feed
+    raises FeedNotModified instead of being downloaded and parsed again.
+    """
+    entries, _ = fetch_feed_entries(limit, request_validators=request_validators)
+    return entries
+
+
+def fetch_feed_entries(
+    limit: int | None = None,
+    *,
+    request_validators: Mapping[str, str] | None = None,
+) -> tuple[list[EntryDict], dict[str, str]]:
+    """Fetch entries plus the feed's ETag/Last-Modified validators.
+
+    Inputs: optional entry limit and validators for a conditional request.
+    Outputs: (entries oldest-first, response validators); validators are empty when
+    the origin sent none or the WordPress fallback was used.
+    Edge cases: raises FeedNotModified on a 304 and SystemExit on unusable feeds.
+    """
     feedparser = _get_feedparser()
-    payload, rss_error = _fetch_rss_payload(RSS_URL)
+    payload, rss_error, response_validators = _fetch_rss_payload(
+        RSS_URL, request_validators=request_validators
+    )
     if rss_error:
         if WORDPRESS_POSTS_API_URL:
             print(
@@ -989,7 +1192,7 @@ def fetch_entries_from_rss(limit: int | None = None) -> list[EntryDict]:
             return _fetch_entries_from_wordpress_posts_api(
                 WORDPRESS_POSTS_API_URL,
                 limit=limit,
-            )
+            ), {}
         raise SystemExit(rss_error)
     if payload is not None:
         if _payload_looks_like_html(payload):
@@ -1001,7 +1204,7 @@ def fetch_entries_from_rss(limit: int | None = None) -> list[EntryDict]:
                 return _fetch_entries_from_wordpress_posts_api(
                     WORDPRESS_POSTS_API_URL,
                     limit=limit,
-                )
+                ), {}
             raise SystemExit(
                 "RSS fetch returned HTML instead of XML (possible CDN block or origin error)."
             )
@@ -1010,15 +1213,67 @@ def fetch_entries_from_rss(limit: int | None = None) -> list[EntryDict]:
         p = feedparser.parse(RSS_URL)
     if not p.entries:
         raise SystemExit("RSS has no entries")
-    entries = [_entry_from_feed(e) for e in p.entries]
-    entries.sort(key=lambda ent: ent["article_pub_utc"])
+    now_utc = datetime.datetime.now(_UTC).isoformat()
+    entries = [_entry_from_feed(e, fallback_pub_utc=now_utc) for e in p.entries]
+    entries.sort(key=operator.itemgetter("article_pub_utc"))
     if limit is not None:
         entries = entries[-limit:]
-    return entries
+    return entries, response_validators
+
+
+def _usable_rss_validators(
+    stored: object, items: Mapping[str, object]
+) -> dict[str, str] | None:
+    """Return stored feed validators only while state still covers that feed.
+
+    Inputs: the stored RSS_VALIDATORS_KEY value and the per-entry state items.
+    Outputs: ETag/Last-Modified mapping for a conditional GET, or None.
+    Edge cases: a 304 would hide entries whose state was dropped since the clean run
+    (reset_episode, manual KV edits), so any missing identifier, or validators stored
+    without their identifier list, forces a full fetch.
+    """
+    if not isinstance(stored, dict):
+        return None
+    stored_map = cast(JSONDict, stored)
+    identifiers = stored_map.get(RSS_VALIDATORS_IDENTIFIERS_KEY)
+    if not isinstance(identifiers, list) or not identifiers:
+        return None
+    if not all(
+        isinstance(identifier, str) and identifier in items
+        for identifier in cast(list[object], identifiers)
+    ):
+        return None
+    validators = {
+        key: value
+        for key in ("etag", "last_modified")
+        if isinstance(value := stored_map.get(key), str) and value
+    }
+    return validators or None
+
 
+def update_latest_state_snapshot(state: JSONDict, candidate: Mapping[str, Any]) -> None:
+    """Maintain legacy top-level keys for backward compatibility.
 
-def update_latest_state_snapshot(state: JSONDict) -> None:
-    """Maintain legacy top-level keys for backward compatibility."""
+    Inputs: pipeline state and the one entry state that just changed.
+    Outputs: None; refreshes last_pub_utc/rss_added/uploaded_url on ``state``.
+    Edge cases: O(1) max update; only a candidate at least as new as the current
+    snapshot replaces it. Use rebuild_latest_state_snapshot after removing items.
+    """
+    pub = candidate.get("last_pub_utc")
+    if isinstance(pub, str) and pub and pub >= str(state.get("last_pub_utc") or ""):
+        state["last_pub_utc"] = pub
+        state["rss_added"] = candidate.get("rss_added")
+        state["uploaded_url"] = candidate.get("uploaded_url")
+
+
+def rebuild_latest_state_snapshot(state: JSONDict) -> None:
+    """Recompute the legacy top-level keys from every item in state.
+
+    Inputs: pipeline state whose items may have been removed or rewritten.
+    Outputs: None; refreshes last_pub_utc/rss_added/uploaded_url on ``state``.
+    Edge cases: full O(N) scan for maintenance scripts; leaves the keys untouched
+    when no item has a last_pub_utc.
+    """
     raw_items = state.get("items")
     if not isinstance(raw_items, dict):
         return
@@ -1040,10 +1295,60 @@ def update_latest_state_snapshot(state: JSONDict) -> None:
         state["uploaded_url"] = latest.get("uploaded_url")
 
 
-def newest_sidecar() -> str | None:
-    """Return the latest sidecar on disk as a fallback when parsing TTS output."""
-    sc = sorted(OUT.glob("*.mp3.rssmeta.json"), key=os.path.getmtime, reverse=True)
-    return str(sc[0]) if sc else None
+def prune_state_items(
+    items: StateItems,
+    keep_identifiers: Iterable[str],
+    *,
+    max_items: int = STATE_MAX_ITEMS,
+) -> int:
+    """Drop the oldest per-entry states so the KV blob stays bounded.
+
+    Inputs: state items, identifiers still listed in the source feed, and the cap.
+    Outputs: number of items removed (0 when already within the cap).
+    Edge cases: identifiers still in the feed are never dropped, since losing their
+    state would make the pipeline regenerate already-published episodes.
+    """
+    if len(items) <= max_items:
+        return 0
+    keep = set(keep_identifiers)
+
+    def item_pub(identifier: str) -> str:
+        data = items[identifier]
+        return str(data.get("last_pub_utc") or data.get("article_pub_utc") or "")
+
+    newest = sorted(items, key=item_pub, reverse=True)[:max_items]
+    keep.update(newest)
+    stale = [identifier for identifier in items if identifier not in keep]
+    for identifier in stale:
+        del items[identifier]
+    return len(stale)
+
+
+# ---------- Episode steps (in-process) ----------
+def _generate_episode(link: str) -> pathlib.Path:
+    """Synthesize audio for ``link`` and return the sidecar path one_episode wrote.
+
+    Inputs: article link of the feed entry to synthesize.
+    Outputs: path to the ``.mp3.rssmeta.json`` sidecar next to the generated MP3.
+    Edge cases: the TTS stack is imported lazily so idle runs never load it.
+    """
+    import one_episode
+
+    return one_episode.run(target_link=link)
+
+
+def _upload_episode(mp3_path: str) -> str:
+    """Upload a generated MP3 to Internet Archive and return its download URL."""
+    import upload_to_ia
+
+    return upload_to_ia.run(pathlib.Path(mp3_path))
+
+
+def _write_feed_item(audio_url: str, episode: StrPath | Mapping[str, Any]) -> None:
+    """Append the episode (sidecar path or in-memory payload) to the RSS feed."""
+    import write_rss
+
+    write_rss.run(audio_url, episode)
 
 
 def main() -> None:
@@ -1069,39 +1374,83 @@ def main() -> None:
 
     state.setdefault("pending_deploy", False)
 
-    entries: list[EntryDict] = fetch_entries_from_rss()
-    if not entries:
-        raise SystemExit("RSS has no entries")
-
-    total_entries = len(entries)
     force_full_rescan = os.getenv("PODCAST_FULL_RESCAN", "").strip().lower() in {
         "1",
         "true",
         "yes",
         "y",
     }
+    retry_failed_entries = _is_retry_failed_enabled()
+    # Conditional fetches are only safe when an unchanged feed means no work: the
+    # validators are stored after runs without failures and ignored for manual
+    # retries or full rescans.
+    request_validators: dict[str, str] | None = None
+    if not force_full_rescan and not retry_failed_entries:
+        request_validators = _usable_rss_validators(
+            state.get(RSS_VALIDATORS_KEY), items
+        )
+
+    response_validators: dict[str, str] = {}
+    try:
+        entries, response_validators = fetch_feed_entries(
+            request_validators=request_validators
+        )
+    except FeedNotModified:
+        print("[info] RSS feed not modified since last clean run; skipping re-scan")
+        entries = []
+    else:
+        if not entries:
+            raise SystemExit("RSS has no entries")
+
+    total_entries = len(entries)
+    # Hash each link once; the candidate filter, IA probes and entry loop share it.
+    indexed: list[tuple[EntryDict, str | None]] = [
+        (
+            entry,
+            ia_identifier_for_link(entry["article_link"])
+            if entry.get("article_link")
+            else None,
+        )
+        for entry in entries
+    ]
+    feed_identifiers = sorted({identifier for _, identifier in indexed if identifier})
+
+    def remember_rss_validators(*, clean_run: bool) -> bool:
+        """Store (or drop) the feed validators; return True when state changed."""
+        if not clean_run:
+            return state.pop(RSS_VALIDATORS_KEY, None) is not None
+        if not response_validators:
+            return False
+        stored: JSONDict = {
+            **response_validators,
+            RSS_VALIDATORS_IDENTIFIERS_KEY: feed_identifiers,
+        }
+        if state.get(RSS_VALIDATORS_KEY) == stored:
+            return False
+        state[RSS_VALIDATORS_KEY] = stored
+        return True
+
+    pruned_items = 0
+    if entries:
+        pruned_items = prune_state_items(
+            items, (identifier for _, identifier in indexed if identifier)
+        )
+        if pruned_items:
+            print(f"[info] Pruned {pruned_items} old entries from state")
     last_processed_pub = state.get("last_pub_utc") or ""
 
     if force_full_rescan:
         print("[info] PODCAST_FULL_RESCAN set; scanning entire feed")
     else:
-        candidates: list[EntryDict] = []
-        for entry in entries:
-            link = entry.get("article_link")
+        candidates: list[tuple[EntryDict, str | None]] = []
+        for entry, identifier in indexed:
             entry_pub = entry.get("article_pub_utc", "")
-            if not link:
-                candidates.append(entry)
+            if identifier is None:
+                candidates.append((entry, identifier))
                 continue
 
-            identifier = ia_identifier_for_link(link)
             entry_state = items.get(identifier)
-            already_recorded = (
-                entry_state
-                and entry_state.get("rss_added")
-                and entry_state.get("last_pub_utc") == entry_pub
-                and entry_state.get("uploaded_url")
-            )
-            if already_recorded:
+            if _state_proves_published(entry_state, entry_pub):
                 continue
 
             if (
@@ -1109,264 +1458,115 @@ def main() -> None:
                 or not entry_state.get("rss_added")
                 or (last_processed_pub and entry_pub and entry_pub > last_processed_pub)
             ):
-                candidates.append(entry)
+                candidates.append((entry, identifier))
 
-        if candidates:
-            entries = candidates
+        indexed = candidates
+        if indexed:
             print(
-                f"[info] Processing {len(entries)} new/changed RSS entries (out of {total_entries})"
+                f"[info] Processing {len(indexed)} new/changed RSS entries (out of {total_entries})"
             )
         else:
-            entries = cast(list[EntryDict], [])
             print("[info] No new RSS entries detected; skipping re-scan")
 
-    feed_xml = os.getenv(
-        "FEED_PATH",
-        str(PUBLIC / (os.getenv("PODCAST_FILE", f"feeds/{SLUG}.xml"))),
+    if not indexed and not state.get("pending_deploy"):
+        # Idle cron run: skip the billing query and deploy gate entirely.
+        if remember_rss_validators(clean_run=True) or pruned_items:
+            kv_put_or_die(state_key, state)
+        print("No pending entries - everything up to date")
+        return
+
+    # Only used for progress output; resolve once instead of per published entry.
+    feed_xml_resolved = pathlib.Path(
+        os.getenv(
+            "FEED_PATH",
+            str(PUBLIC / (os.getenv("PODCAST_FILE", f"feeds/{SLUG}.xml"))),
+        )
+    ).resolve()
+
+    # Entries whose state already proves publication never need the HEAD probe.
+    ia_presence = _probe_ia_presence(
+        identifier
+        for entry, identifier in indexed
+        if identifier is not None
+        and not _state_proves_published(
+            items.get(identifier), entry.get("article_pub_utc", "")
+        )
     )
 
     generation_environment_ready = False
     feed_updated = False
     processed = False
     run_characters = 0
-    retry_failed_entries = _is_retry_failed_enabled()
     retry_failed_limit = _get_retry_failed_limit()
     retried_exhausted_entries = 0
     max_retry_attempts = _get_max_retry_attempts()
     attempted_entries = 0
+    failed_entries = 0
     exhausted_entries = 0
 
-    def estimate_characters(meta_like: Mapping[str, Any]) -> int:
-        """Approximate characters for billing before we run expensive TTS work."""
-        summary = str(meta_like.get("article_summary") or "")
-        summary_clean = re.sub("<.*?>", "", summary)
-        subtitle = str(meta_like.get("article_subtitle") or "")
-        title = str(meta_like.get("article_title", ""))
-        parts: list[str] = [title, subtitle, summary_clean]
-        plain = "\n".join([p for p in parts if p]).strip()
-        return len(plain)
-
-    for entry in entries:
-        link = entry.get("article_link")
-        if not link:
-            print(f"[skip] Entry missing link: {entry['article_title']}")
-            continue
-
-        identifier = ia_identifier_for_link(link)
-        entry_state_obj = items.get(identifier)
-        if isinstance(entry_state_obj, dict):
-            entry_state = entry_state_obj
-        else:
-            entry_state = {}
-
-        if not entry_state:
-            legacy_pub = state.get("last_pub_utc")
-            if legacy_pub and legacy_pub == entry["article_pub_utc"]:
-                entry_state.update(
-                    {
-                        "last_pub_utc": legacy_pub,
-                        "rss_added": state.get("rss_added", False),
-                        "uploaded_url": state.get("uploaded_url"),
-                    }
-                )
-        items[identifier] = entry_state
-
-        entry_state.setdefault("article_title", entry["article_title"])
-        entry_state.setdefault("article_link", link)
-        entry_state.setdefault("article_pub_utc", entry["article_pub_utc"])
-        entry_state.setdefault("tts_characters", estimate_characters(entry))
-        entry_state["article_summary"] = entry["article_summary"]
-        entry_state["article_summary_html"] = entry.get("article_summary_html", "")
-        entry_state["article_subtitle"] = entry.get("article_subtitle", "")
-        entry_state["article_image_url"] = entry.get("article_image_url", "")
-
-        ia_present = ia_has_episode_http(identifier)
-        last_pub = entry_state.get("last_pub_utc")
-        already_in_feed = bool(entry_state.get("rss_added"))
-
-        print("\n[entry]")
-        print(f"  title: {entry['article_title']}")
-        print(f"  link:  {link}")
-        print(f"  id:    {identifier}")
-        print(f"  pub:   {entry['article_pub_utc']}")
-        print(f"  IA has audio: {ia_present}")
-        print(f"  feed already updated: {already_in_feed}")
-
-        failure_attempt_count, stored_max_attempts, retry_exhausted = (
-            _get_failure_attempt_summary(entry_state)
-        )
-        if failure_attempt_count:
-            print(
-                "  previous failed attempts: "
-                f"{failure_attempt_count}/{stored_max_attempts}"
-            )
-
-        if _should_skip_failed_entry(
-            entry_state, entry["article_pub_utc"], retry_failed_entries
-        ):
-            last_failed_at = entry_state.get(FAILED_ENTRY_AT_UTC_KEY, "")
-            last_failed_step = entry_state.get(FAILED_ENTRY_STEP_KEY, "")
-            print(
-                "  → Skipping retry-exhausted entry "
-                f"(last_failure_at={last_failed_at}, step={last_failed_step}, "
-                f"attempts={failure_attempt_count}/{stored_max_attempts})"
-            )
-            print(f"  → Set {RETRY_FAILED_ENV_NAME}=1 to retry this entry")
-            continue
-        if retry_failed_entries and retry_exhausted:
-            if (
-                retry_failed_limit is not None
-                and retried_exhausted_entries >= retry_failed_limit
-            ):
-                print(
-                    "  → Skipping retry-exhausted entry because "
-                    f"{RETRY_FAILED_LIMIT_ENV_NAME}={retry_failed_limit} was reached"
-                )
-                continue
-            retried_exhausted_entries += 1
-
-        if ia_present and last_pub == entry["article_pub_utc"] and already_in_feed:
-            print("  → Skipping (already processed)")
-            continue
+    state_dirty = pruned_items > 0
+    failures_since_flush = 0
 
-        ia_url = f"https://archive.org/download/{identifier}/episode.mp3"
-
-        # Case: audio exists but feed is missing the episode
-        if ia_present and last_pub == entry["article_pub_utc"] and not already_in_feed:
-            print("  → Restoring feed entry from existing audio")
-            sidecar_path = OUT / f"sidecar-{link_hash(link)}.json"
-            OUT.mkdir(parents=True, exist_ok=True)
-            payload = entry | {
-                "mp3_local_path": "",
-                "mp3_filename": "episode.mp3",
-                "generated_il_iso": "",
-                "tts_characters": entry_state.get(
-                    "tts_characters", estimate_characters(entry)
-                ),
-                "tts_generated": False,
-            }
-            with sidecar_path.open("w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-            sh(PY, str(ROOT / "write_rss.py"), ia_url, str(sidecar_path))
-
-            entry_state.update(
-                {
-                    "uploaded_url": ia_url,
-                    "rss_added": True,
-                    "last_pub_utc": entry["article_pub_utc"],
-                    "article_pub_utc": entry["article_pub_utc"],
-                    "article_subtitle": entry.get("article_subtitle", ""),
-                    "article_summary": entry.get("article_summary", ""),
-                    "article_summary_html": entry.get("article_summary_html", ""),
-                    "article_image_url": entry.get("article_image_url", ""),
-                }
-            )
-            _clear_entry_failure(entry_state)
-            state["pending_deploy"] = True
-            update_latest_state_snapshot(state)
-            kv_put_or_die(state_key, state)
+    def persist_published_state() -> None:
+        """Write state to KV right after an episode is uploaded and in the feed.
 
-            feed_updated = True
-            processed = True
-            print(f"  Feed updated -> {pathlib.Path(feed_xml).resolve()}")
-            print(f"  Audio: {ia_url}")
-            continue
-
-        # Otherwise we need to synthesize + upload
-        attempted_entries += 1
-        if not generation_environment_ready:
-            _ensure_audio_generation_environment_ready()
-            generation_environment_ready = True
-
-        print("  → Generating audio")
-        env = os.environ.copy()
-        env["TARGET_ENTRY_LINK"] = link or ""
-        try:
-            out1 = sh(PY, str(ROOT / "one_episode.py"), env=env)
-        except subprocess.CalledProcessError as exc:
-            output_text = getattr(exc, "output", "") or ""
-            if not isinstance(output_text, str):
-                output_text = str(output_text)
-            failure_message = output_text.strip() or str(exc)
-            failure_message = _truncate_text(failure_message, FAILURE_MESSAGE_MAX_CHARS)
-            if (
-                "No such file or directory: 'ffprobe'" in failure_message
-                or "No such file or directory: 'ffmpeg'" in failure_message
-                or "Unable to acquire impersonated credentials" in failure_message
-                or "DefaultCredentialsError" in failure_message
-                or "GOOGLE_APPLICATION_CREDENTIALS" in failure_message
-                or "IAM Service Account Credentials API" in failure_message
-            ):
-                raise SystemExit(
-                    "Audio generation sanity check failed while running one_episode.py: "
-                    f"{failure_message}"
-                ) from exc
-            _record_entry_failure(
-                entry_state,
-                identifier=identifier,
-                link=link,
-                entry_pub_utc=entry["article_pub_utc"],
-                step=FAILURE_STEP_GENERATE_AUDIO,
-                message=failure_message,
-                max_retry_attempts=max_retry_attempts,
-            )
-            items[identifier] = entry_state
-            print("  → ERROR: one_episode.py failed; continuing to next entry")
-            print(f"  → Failure stored for id={identifier} link={link}")
-            failure_attempt_count, stored_max_attempts, retry_exhausted = (
-                _get_failure_attempt_summary(entry_state)
-            )
-            print(f"  → Retry attempts: {failure_attempt_count}/{stored_max_attempts}")
-            if retry_exhausted:
-                exhausted_entries += 1
-                print(
-                    "  → Retry limit reached; future scheduled runs will skip this entry"
-                )
-            if failure_message:
-                print(f"  → Failure summary: {failure_message}")
-            if not kv_put(state_key, state):
-                print("[kv] Warning: failed to persist failure state to KV")
-            continue
-
-        sidecar_path = None
-        for line in out1.splitlines()[::-1]:
-            if line.startswith("Sidecar: "):
-                sidecar_path = line.split("Sidecar: ", 1)[1].strip()
-                break
-        if not sidecar_path:
-            sidecar_path = newest_sidecar()
-            if not sidecar_path:
-                raise SystemExit("No sidecar found after generation")
-
-        with open(sidecar_path, "r", encoding="utf-8") as f:
-            meta = cast(JSONDict, json.load(f))
-
-        generated_this_run = meta.get("tts_generated", True)
-        char_count = meta.get("tts_characters")
-        if char_count is None:
-            char_count = estimate_characters(entry)
-        entry_state["tts_characters"] = char_count
-        entry_state["article_subtitle"] = meta.get(
-            "article_subtitle", entry.get("article_subtitle", "")
-        )
-        entry_state["article_summary"] = meta.get(
-            "article_summary", entry.get("article_summary", "")
-        )
-        entry_state["article_summary_html"] = meta.get(
-            "article_summary_html", entry.get("article_summary_html", "")
-        )
-        entry_state["article_image_url"] = meta.get(
-            "article_image_url", entry.get("article_image_url", "")
-        )
-
-        print("  → Uploading to Internet Archive")
-        out2 = sh(PY, str(ROOT / "upload_to_ia.py"), meta["mp3_local_path"])
-        ia_url = None
-        for line in out2.splitlines():
-            if line.startswith("OK:"):
-                ia_url = line.split(" ", 1)[1].strip()
-        if not ia_url:
-            raise SystemExit("Upload failed or no IA URL captured")
+        Inputs: none (writes the shared state, including any batched failures).
+        Outputs: None.
+        Edge cases: KV failure aborts the run; a published episode missing from KV
+        would be synthesized and uploaded again by the next run.
+        """
+        nonlocal state_dirty, failures_since_flush
+        kv_put_or_die(state_key, state)
+        state_dirty = False
+        failures_since_flush = 0
+
+    def flush_state(*, force: bool = False) -> None:
+        """Best-effort write of batched failure bookkeeping.
+
+        Inputs: force=True for checkpoints (end of loop, errors) regardless of batch size.
+        Outputs: None; writes state to KV when dirty (kv_put drops unchanged bodies).
+        Edge cases: KV failure only warns, as a lost attempt counter just means one
+        more retry; the state stays dirty for the next flush.
+        """
+        nonlocal state_dirty, failures_since_flush
+        if not state_dirty:
+            return
+        if not force and failures_since_flush < KV_FLUSH_EVERY_ENTRIES:
+            return
+        if kv_put(state_key, state):
+            state_dirty = False
+            failures_since_flush = 0
+        else:
+            print("[kv] Warning: failed to persist failure state to KV")
+
+    def mark_failure_recorded() -> None:
+        """Count one more stored entry failure and flush on batch boundaries."""
+        nonlocal state_dirty, failures_since_flush
+        state_dirty = True
+        failures_since_flush += 1
+        flush_state()
+
+    # One upload runs in the background while the next entry is synthesized; RSS
+    # writes stay on this thread so feed items keep their processing order.
+    upload_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ia-upload")
+    pending_upload: (
+        tuple[Future[str], JSONDict, JSONDict, JSONDict, pathlib.Path] | None
+    ) = None
+
+    def finish_pending_upload() -> None:
+        """Wait for the in-flight upload, then record its feed item and state.
+
+        Inputs: none (reads the pending upload queued by the entry loop).
+        Outputs: None; writes the RSS item and marks entry state published.
+        Edge cases: upload failures re-raise here, ending the run as before.
+        """
+        nonlocal pending_upload, feed_updated, processed
+        if pending_upload is None:
+            return
+        future, entry, entry_state, meta, sidecar_path = pending_upload
+        pending_upload = None
+        ia_url = future.result()
+        print(f"\n[upload done] {entry['article_title']}")
 
         mp3_path = pathlib.Path(meta["mp3_local_path"])
         if mp3_path.exists():
@@ -1377,7 +1577,7 @@ def main() -> None:
                 print(f"  → Warning: could not delete MP3: {e}")
 
         print("  → Updating RSS feed")
-        sh(PY, str(ROOT / "write_rss.py"), ia_url, sidecar_path)
+        _write_feed_item(ia_url, sidecar_path)
 
         entry_state.update(
             {
@@ -1400,20 +1600,254 @@ def main() -> None:
             }
         )
         _clear_entry_failure(entry_state)
-        if generated_this_run:
-            usage["cumulative_characters"] = (
-                usage.get("cumulative_characters", 0) + char_count
-            )
-            run_characters += char_count
-        state["pending_deploy"] = True
-        update_latest_state_snapshot(state)
-        kv_put_or_die(state_key, state)
+        if not state.get("pending_deploy"):
+            state["pending_deploy"] = True
+        update_latest_state_snapshot(state, entry_state)
+        persist_published_state()
 
         feed_updated = True
         processed = True
-        print(f"  Feed updated -> {pathlib.Path(feed_xml).resolve()}")
+        print(f"  Feed updated -> {feed_xml_resolved}")
         print(f"  Audio: {ia_url}")
 
+    try:
+        for entry, identifier in indexed:
+            link = entry.get("article_link")
+            if not link or identifier is None:
+                print(f"[skip] Entry missing link: {entry['article_title']}")
+                continue
+
+            entry_state_obj: object = items.setdefault(identifier, {})
+            if isinstance(entry_state_obj, dict):
+                entry_state = cast(JSONDict, entry_state_obj)
+            else:
+                entry_state = {}
+                items[identifier] = entry_state
+
+            if not entry_state:
+                # First sighting: fill the write-once fields in a single update.
+                legacy_pub = state.get("last_pub_utc")
+                if legacy_pub and legacy_pub == entry["article_pub_utc"]:
+                    entry_state.update(
+                        {
+                            "last_pub_utc": legacy_pub,
+                            "rss_added": state.get("rss_added", False),
+                            "uploaded_url": state.get("uploaded_url"),
+                        }
+                    )
+                entry_state.update(
+                    {
+                        "article_title": entry["article_title"],
+                        "article_link": link,
+                        "article_pub_utc": entry["article_pub_utc"],
+                        "tts_characters": estimate_characters(entry),
+                    }
+                )
+            else:
+                entry_state.setdefault("article_title", entry["article_title"])
+                entry_state.setdefault("article_link", link)
+                entry_state.setdefault("article_pub_utc", entry["article_pub_utc"])
+                if "tts_characters" not in entry_state:
+                    entry_state["tts_characters"] = estimate_characters(entry)
+            entry_state["article_summary"] = entry["article_summary"]
+            entry_state["article_summary_html"] = entry.get("article_summary_html", "")
+            entry_state["article_subtitle"] = entry.get("article_subtitle", "")
+            entry_state["article_image_url"] = entry.get("article_image_url", "")
+
+            if _state_proves_published(entry_state, entry["article_pub_utc"]):
+                ia_present = True
+            else:
+                ia_present = ia_presence.get(identifier)
+                if ia_present is None:
+                    ia_present = ia_has_episode_http(identifier)
+            last_pub = entry_state.get("last_pub_utc")
+            already_in_feed = bool(entry_state.get("rss_added"))
+
+            print(
+                f"\n[entry]\n  title: {entry['article_title']}\n  link:  {link}\n"
+                f"  id:    {identifier}\n  pub:   {entry['article_pub_utc']}\n"
+                f"  IA has audio: {ia_present}\n  feed already updated: {already_in_feed}"
+            )
+
+            failure_attempt_count, stored_max_attempts, retry_exhausted = (
+                _get_failure_attempt_summary(entry_state)
+            )
+            if failure_attempt_count:
+                print(
+                    "  previous failed attempts: "
+                    f"{failure_attempt_count}/{stored_max_attempts}"
+                )
+
+            if _should_skip_failed_entry(
+                entry_state, entry["article_pub_utc"], retry_failed_entries
+            ):
+                last_failed_at = entry_state.get(FAILED_ENTRY_AT_UTC_KEY, "")
+                last_failed_step = entry_state.get(FAILED_ENTRY_STEP_KEY, "")
+                print(
+                    "  → Skipping retry-exhausted entry "
+                    f"(last_failure_at={last_failed_at}, step={last_failed_step}, "
+                    f"attempts={failure_attempt_count}/{stored_max_attempts})"
+                )
+                print(f"  → Set {RETRY_FAILED_ENV_NAME}=1 to retry this entry")
+                continue
+            if retry_failed_entries and retry_exhausted:
+                if (
+                    retry_failed_limit is not None
+                    and retried_exhausted_entries >= retry_failed_limit
+                ):
+                    print(
+                        "  → Skipping retry-exhausted entry because "
+                        f"{RETRY_FAILED_LIMIT_ENV_NAME}={retry_failed_limit} was reached"
+                    )
+                    continue
+                retried_exhausted_entries += 1
+
+            if ia_present and last_pub == entry["article_pub_utc"] and already_in_feed:
+                print("  → Skipping (already processed)")
+                continue
+
+            ia_url = f"https://archive.org/download/{identifier}/episode.mp3"
+
+            # Case: audio exists but feed is missing the episode
+            if (
+                ia_present
+                and last_pub == entry["article_pub_utc"]
+                and not already_in_feed
+            ):
+                print("  → Restoring feed entry from existing audio")
+                finish_pending_upload()
+                # The feed entry already carries every field write_rss reads.
+                _write_feed_item(ia_url, entry)
+
+                entry_state.update(
+                    {
+                        "uploaded_url": ia_url,
+                        "rss_added": True,
+                        "last_pub_utc": entry["article_pub_utc"],
+                        "article_pub_utc": entry["article_pub_utc"],
+                        "article_subtitle": entry.get("article_subtitle", ""),
+                        "article_summary": entry.get("article_summary", ""),
+                        "article_summary_html": entry.get("article_summary_html", ""),
+                        "article_image_url": entry.get("article_image_url", ""),
+                    }
+                )
+                _clear_entry_failure(entry_state)
+                if not state.get("pending_deploy"):
+                    state["pending_deploy"] = True
+                update_latest_state_snapshot(state, entry_state)
+                persist_published_state()
+
+                feed_updated = True
+                processed = True
+                print(f"  Feed updated -> {feed_xml_resolved}")
+                print(f"  Audio: {ia_url}")
+                continue
+
+            # Otherwise we need to synthesize + upload
+            attempted_entries += 1
+            if not generation_environment_ready:
+                _ensure_audio_generation_environment_ready()
+                generation_environment_ready = True
+
+            print("  → Generating audio")
+            try:
+                sidecar_path = _generate_episode(link)
+            except (Exception, SystemExit) as exc:
+                # one_episode reports unusable sources via SystemExit; record those
+                # like any other per-entry failure instead of ending the run.
+                failure_message = f"{type(exc).__name__}: {exc}"
+                failure_message = _truncate_text(
+                    failure_message, FAILURE_MESSAGE_MAX_CHARS
+                )
+                if (
+                    "No such file or directory: 'ffprobe'" in failure_message
+                    or "No such file or directory: 'ffmpeg'" in failure_message
+                    or "Unable to acquire impersonated credentials" in failure_message
+                    or "DefaultCredentialsError" in failure_message
+                    or "GOOGLE_APPLICATION_CREDENTIALS" in failure_message
+                    or "IAM Service Account Credentials API" in failure_message
+                ):
+                    raise SystemExit(
+                        "Audio generation sanity check failed while running one_episode: "
+                        f"{failure_message}"
+                    ) from exc
+                _record_entry_failure(
+                    entry_state,
+                    identifier=identifier,
+                    link=link,
+                    entry_pub_utc=entry["article_pub_utc"],
+                    step=FAILURE_STEP_GENERATE_AUDIO,
+                    message=failure_message,
+                    max_retry_attempts=max_retry_attempts,
+                )
+                print("  → ERROR: one_episode failed; continuing to next entry")
+                print(f"  → Failure stored for id={identifier} link={link}")
+                failed_entries += 1
+                failure_attempt_count, stored_max_attempts, retry_exhausted = (
+                    _get_failure_attempt_summary(entry_state)
+                )
+                print(
+                    f"  → Retry attempts: {failure_attempt_count}/{stored_max_attempts}"
+                )
+                if retry_exhausted:
+                    exhausted_entries += 1
+                    print(
+                        "  → Retry limit reached; future scheduled runs will skip this entry"
+                    )
+                if failure_message:
+                    print(f"  → Failure summary: {failure_message}")
+                mark_failure_recorded()
+                continue
+
+            meta: JSONDict = json_utils.loads(sidecar_path.read_bytes())
+
+            char_count = meta.get("tts_characters")
+            if char_count is None:
+                char_count = estimate_characters(entry)
+            entry_state["tts_characters"] = char_count
+            # Characters are billed at synthesis, so count them now rather than
+            # after an upload that may still fail.
+            if meta.get("tts_generated", True):
+                usage["cumulative_characters"] = (
+                    usage.get("cumulative_characters", 0) + char_count
+                )
+                run_characters += char_count
+                state_dirty = True
+            entry_state["article_subtitle"] = meta.get(
+                "article_subtitle", entry.get("article_subtitle", "")
+            )
+            entry_state["article_summary"] = meta.get(
+                "article_summary", entry.get("article_summary", "")
+            )
+            entry_state["article_summary_html"] = meta.get(
+                "article_summary_html", entry.get("article_summary_html", "")
+            )
+            entry_state["article_image_url"] = meta.get(
+                "article_image_url", entry.get("article_image_url", "")
+            )
+
+            # Publish the previous episode before queueing this one so at most one
+            # upload is in flight and local MP3s never pile up.
+            finish_pending_upload()
+            print("  → Uploading to Internet Archive")
+            pending_upload = (
+                upload_pool.submit(_upload_episode, meta["mp3_local_path"]),
+                entry,
+                entry_state,
+                meta,
+                sidecar_path,
+            )
+
+        finish_pending_upload()
+        if remember_rss_validators(clean_run=failed_entries == 0):
+            state_dirty = True
+    finally:
+        try:
+            finish_pending_upload()
+        finally:
+            upload_pool.shutdown(wait=True)
+            flush_state(force=True)
+
     if attempted_entries == 0 and not processed:
         print("No pending entries - everything up to date")
 
@@ -1474,8 +1908,8 @@ def main() -> None:
     if deploy_needed:
         if not feed_updated and pending_deploy:
             print("Feed unchanged but pending deploy exists; retrying deploy")
-        ran, success = deploy_pages()
-        if ran and success:
+        ran, success = deploy_pages(state, feed_updated=feed_updated)
+        if success:
             state["pending_deploy"] = False
             kv_put_or_die(state_key, state)
         else:
@@ -1496,18 +1930,63 @@ def main() -> None:
         )
 
 
-def deploy_pages() -> tuple[bool, bool]:
-    """Kick Cloudflare Pages so listeners can see RSS/website updates right away."""
+def _dir_hash(root: StrPath) -> str:
+    """Fingerprint a build directory from its file names and contents.
+
+    Inputs: root directory to walk (the Pages deploy folder).
+    Outputs: hex blake2b digest over sorted (relative path, size, content digest).
+    Edge cases: mtimes are ignored on purpose, since a fresh CI checkout or a
+    regenerated-but-identical file must still match the last deploy. A missing
+    directory or unreadable files hash as an empty/partial tree.
+    """
+    records: list[tuple[str, int, str]] = []
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                with open(path, "rb") as fh:
+                    size = os.fstat(fh.fileno()).st_size
+                    content = hashlib.file_digest(fh, "blake2b").hexdigest()
+            except OSError:
+                continue
+            records.append((os.path.relpath(path, root), size, content))
+    digest = hashlib.blake2b(digest_size=16)
+    for relpath, size, content in sorted(records):
+        digest.update(f"{relpath}\0{size}\0{content}\n".encode())
+    return digest.hexdigest()
+
+
+def deploy_pages(
+    state: JSONDict | None = None, *, feed_updated: bool = True
+) -> tuple[bool, bool]:
+    """Kick Cloudflare Pages so listeners can see RSS/website updates right away.
+
+    Inputs: optional pipeline state (read/updated for the last deployed tree hash) and
+    whether this run changed the feed.
+    Outputs: (ran, success). A retry whose build output matches the last successful
+    deploy is skipped without starting Wrangler and reported as (False, True).
+    """
     # Optional automatic deploy to Cloudflare Pages with Wrangler
     if CF_API_TOKEN and CF_PAGES_PROJECT:
         wrangler_path = resolve_wrangler_path()
         if wrangler_path:
+            current_hash = _dir_hash(PAGES_DEPLOY_DIR)
+            if (
+                state is not None
+                and not feed_updated
+                and current_hash == state.get(LAST_DEPLOYED_HASH_KEY)
+            ):
+                print(
+                    f"{PAGES_DEPLOY_DIR}/ unchanged since last successful deploy; "
+                    "skipping Wrangler"
+                )
+                return False, True
             try:
                 deploy_args = [
                     wrangler_path,
                     "pages",
                     "deploy",
-                    "public",
+                    PAGES_DEPLOY_DIR,
                     "--project-name",
                     CF_PAGES_PROJECT,
                     "--commit-dirty=true",
@@ -1525,6 +2004,8 @@ def deploy_pages() -> tuple[bool, bool]:
                     deploy_args.extend(["--commit-hash", commit])
                 sh(*deploy_args)
                 print("Cloudflare Pages deploy OK")
+                if state is not None:
+                    state[LAST_DEPLOYED_HASH_KEY] = current_hash
                 return True, True
             except Exception as e:
                 print(f"Wrangler deploy failed: {e}")
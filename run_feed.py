@@ -5,11 +5,42 @@ import os
 import pathlib
 import sys
 
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
 ROOT = pathlib.Path(__file__).resolve().parent
 
 
+def load_feed_env(slug: str, root: pathlib.Path = ROOT) -> pathlib.Path:
+    """Load the shared .env, then the feed's configs/<slug>.env, into os.environ.
+
+    Inputs: feed slug and the repository root (defaults to this checkout).
+    Outputs: path of the feed env file that was loaded.
+    Edge cases: global values never override the process env while feed values
+    always win; the feed file is parsed after the global one so ${VAR} references
+    can use it. A missing global .env only warns; a missing feed env exits.
+    """
+    global_env = root / ".env"
+    feed_env = root / "configs" / f"{slug}.env"
+
+    if global_env.exists():
+        for key, value in dotenv_values(global_env).items():
+            if value is not None:
+                os.environ.setdefault(key, value)
+    else:
+        print("Warning: global .env not found")
+
+    if not feed_env.exists():
+        sys.exit(f"Missing feed env: {feed_env}")
+    os.environ.update(
+        {
+            key: value
+            for key, value in dotenv_values(feed_env).items()
+            if value is not None
+        }
+    )
+    return feed_env
+
+
 def main():
     """Entry point for operators: pick a slug, load .env files, run pipeline.py."""
     try:
@@ -22,17 +53,7 @@ def main():
         sys.exit(2)
 
     slug = sys.argv[1]
-    global_env = ROOT / ".env"
-    feed_env = ROOT / "configs" / f"{slug}.env"
-
-    if global_env.exists():
-        load_dotenv(dotenv_path=global_env, override=False)
-    else:
-        print("Warning: global .env not found")
-
-    if not feed_env.exists():
-        sys.exit(f"Missing feed env: {feed_env}")
-    load_dotenv(dotenv_path=feed_env, override=True)
+    feed_env = load_feed_env(slug)
 
     print(f"[run] feed={slug} env={feed_env}")
     try:
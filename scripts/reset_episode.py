@@ -10,23 +10,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import pathlib
 import sys
 from typing import Any, cast
 
-from dotenv import load_dotenv
-
-
-def load_env(slug: str, root: pathlib.Path) -> None:
-    """Load the shared .env then the feed-specific env."""
-    global_env = root / ".env"
-    if global_env.exists():
-        load_dotenv(dotenv_path=global_env, override=False)
-    feed_env = root / "configs" / f"{slug}.env"
-    if not feed_env.exists():
-        raise SystemExit(f"Missing feed env: {feed_env}")
-    load_dotenv(dotenv_path=feed_env, override=True)
-
 
 def delete_path(path: pathlib.Path, *, dry_run: bool) -> bool:
     """Delete a file if present, respecting dry-run."""
@@ -40,25 +28,92 @@ def delete_path(path: pathlib.Path, *, dry_run: bool) -> bool:
     return True
 
 
+def sidecar_paths_for_link(link: str, out_dir: pathlib.Path) -> list[pathlib.Path]:
+    """List generated sidecars in out_dir whose filename slug matches ``link``.
+
+    Inputs: article link and the output directory.
+    Outputs: paths named ``<timestamp>-<slugify(link)>.mp3.rssmeta.json``.
+    Edge cases: names only come from the directory listing (nothing is opened); slugs
+    are truncated, so callers must still confirm article_link inside each file.
+    """
+    from content_utils import slugify
+
+    suffix = f"-{slugify(link)}.mp3.rssmeta.json"
+    try:
+        with os.scandir(out_dir) as listing:
+            return [
+                pathlib.Path(item.path)
+                for item in listing
+                if item.name.endswith(suffix)
+            ]
+    except FileNotFoundError:
+        return []
+
+
 def cleanup_local(
     link: str, *, root: pathlib.Path, out_dir: pathlib.Path, dry_run: bool
 ) -> list[str]:
     """Remove all local artifacts for the target article."""
+    import json_utils
+
     removed: list[str] = []
-    seen: set[pathlib.Path] = set()
+    # Keyed on (st_dev, st_ino): one stat per candidate instead of a realpath per
+    # comparison, and still catches the same file reached via different paths.
+    seen: set[tuple[int, int]] = set()
 
-    for sidecar in out_dir.glob("*.mp3.rssmeta.json"):
-        meta: dict[str, Any] | None = None
+    def file_identity(path: pathlib.Path) -> tuple[int, int] | None:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def delete_once(path: pathlib.Path) -> None:
+        identity = file_identity(path)
+        if identity is None or identity in seen:
+            return
+        seen.add(identity)
+        if delete_path(path, dry_run=dry_run):
+            removed.append(str(path))
+
+    # Every JSON writer we have used emits the link in one of these two spellings,
+    # so a sidecar containing neither cannot match and is never parsed.
+    link_needles = {
+        json.dumps(link, ensure_ascii=False).encode("utf-8"),
+        json.dumps(link).encode("ascii"),
+    }
+
+    def matching_meta(sidecar: str | pathlib.Path) -> dict[str, Any] | None:
         try:
-            with sidecar.open("r", encoding="utf-8") as f:
-                meta = cast(dict[str, Any], json.load(f))
+            with open(sidecar, "rb") as f:
+                raw = f.read()
+            if not any(needle in raw for needle in link_needles):
+                return None
+            meta = cast(dict[str, Any], json_utils.loads(raw))
         except Exception:
-            meta = None
-        if meta is None:
-            continue
-        if meta.get("article_link") != link:
-            continue
-
+            return None
+        return meta if meta.get("article_link") == link else None
+
+    # Sidecar names embed the link slug, so only those few files need parsing; fall
+    # back to checking every sidecar for names that predate or defeat the slug.
+    matches = [
+        (sidecar, meta)
+        for sidecar in sidecar_paths_for_link(link, out_dir)
+        if (meta := matching_meta(sidecar)) is not None
+    ]
+    if not matches and out_dir.is_dir():
+        # DirEntry.path is already a str; only matches become Path objects.
+        with os.scandir(out_dir) as listing:
+            sidecar_names = [
+                item.path for item in listing if item.name.endswith(".mp3.rssmeta.json")
+            ]
+        matches = [
+            (pathlib.Path(sidecar), meta)
+            for sidecar in sidecar_names
+            if (meta := matching_meta(sidecar)) is not None
+        ]
+
+    for sidecar, meta in matches:
         mp3_path = pathlib.Path(str(meta.get("mp3_local_path") or "")).expanduser()
         if mp3_path and not mp3_path.is_absolute():
             mp3_path = (root / mp3_path).resolve()
@@ -66,22 +121,14 @@ def cleanup_local(
             guess = sidecar.name.replace(".rssmeta.json", "")
             mp3_path = (sidecar.parent / guess).resolve()
 
-        for target in (mp3_path, sidecar.resolve()):
-            if target in seen:
-                continue
-            seen.add(target)
-            if delete_path(target, dry_run=dry_run):
-                removed.append(str(target))
+        delete_once(mp3_path)
+        delete_once(sidecar)
 
-    # Also remove the link-hash sidecar used when restoring feed entries.
+    # Also remove the link-hash sidecar older runs wrote when restoring feed entries.
     try:
         import pipeline  # imported lazily so env is loaded first
 
-        hash_sidecar = out_dir / f"sidecar-{pipeline.link_hash(link)}.json"
-        if hash_sidecar.resolve() not in seen and delete_path(
-            hash_sidecar.resolve(), dry_run=dry_run
-        ):
-            removed.append(str(hash_sidecar.resolve()))
+        delete_once(out_dir / f"sidecar-{pipeline.link_hash(link)}.json")
     except Exception:
         removed = removed
 
@@ -102,10 +149,11 @@ def main() -> None:
     args = parser.parse_args()
 
     root = pathlib.Path(__file__).resolve().parent.parent
-    load_env(args.slug, root)
-
     # Ensure repo root is importable, then import after env so pipeline picks up the correct slug/prefix.
     sys.path.insert(0, str(root))
+    from run_feed import load_feed_env
+
+    load_feed_env(args.slug, root)
     import pipeline
 
     if pipeline.SLUG != args.slug:
@@ -137,7 +185,11 @@ def main() -> None:
         for key in ("last_pub_utc", "rss_added", "uploaded_url"):
             state.pop(key, None)
 
-    pipeline.update_latest_state_snapshot(state)
+    pipeline.rebuild_latest_state_snapshot(state)
+    if removed_kv:
+        # Otherwise the next run's conditional GET gets a 304 for the unchanged source
+        # feed and never sees the entry again.
+        state.pop(pipeline.RSS_VALIDATORS_KEY, None)
 
     if removed_kv and not args.dry_run:
         pipeline.kv_put_or_die(state_key, state)
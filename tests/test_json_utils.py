@@ -0,0 +1,32 @@
+"""Tests for the shared JSON helpers."""
+
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+import json_utils
+
+
+def test_write_json_atomic_round_trips_and_leaves_no_temp_file(
+    tmp_path: pathlib.Path,
+) -> None:
+    """Atomic writes should produce the full document and clean up after themselves.
+
+    Inputs: a payload with non-ASCII text written twice to the same path.
+    Outputs: the second payload is readable and no ``.tmp`` sibling remains.
+    Edge cases: a payload that cannot be serialized leaves the previous file intact.
+    """
+
+    target = tmp_path / "episode.mp3.rssmeta.json"
+    json_utils.write_json_atomic(target, {"title": "first"})
+    json_utils.write_json_atomic(target, {"title": "שלום"}, indent=True)
+
+    assert json_utils.loads(target.read_bytes()) == {"title": "שלום"}
+
+    with pytest.raises(TypeError):
+        json_utils.write_json_atomic(target, {"bad": object()})
+
+    assert json_utils.loads(target.read_bytes()) == {"title": "שלום"}
+    assert sorted(path.name for path in tmp_path.iterdir()) == [target.name]
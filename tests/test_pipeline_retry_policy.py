@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import pathlib
-import subprocess
 import sys
 import types
 
@@ -72,9 +71,10 @@ def test_fetch_entries_from_rss_falls_back_to_wordpress_posts_api_when_rss_is_bl
     monkeypatch.setattr(
         pipeline,
         "_fetch_rss_payload",
-        lambda rss_url: (
+        lambda rss_url, **kwargs: (
             None,
             "Failed to fetch source RSS feed 'https://example.com/feed.xml': blocked at Cloudflare (HTTP 403).",
+            {},
         ),
     )
 
@@ -156,7 +156,7 @@ def test_fetch_entries_from_rss_uses_wordpress_posts_limit_when_requested(
     monkeypatch.setattr(
         pipeline,
         "_fetch_rss_payload",
-        lambda rss_url: (None, "Failed to fetch source RSS feed."),
+        lambda rss_url, **kwargs: (None, "Failed to fetch source RSS feed.", {}),
     )
 
     class FakeJSONResponse:
@@ -236,18 +236,21 @@ def test_main_fails_when_entry_reaches_retry_limit(
     )
     monkeypatch.setattr(
         pipeline,
-        "fetch_entries_from_rss",
-        lambda: [
-            {
-                "article_title": "Example",
-                "article_link": "https://example.com/article",
-                "article_summary": "Summary",
-                "article_summary_html": "<p>Summary</p>",
-                "article_subtitle": "",
-                "article_pub_utc": "2026-04-03T10:00:00+00:00",
-                "article_image_url": "",
-            }
-        ],
+        "fetch_feed_entries",
+        lambda **kwargs: (
+            [
+                {
+                    "article_title": "Example",
+                    "article_link": "https://example.com/article",
+                    "article_summary": "Summary",
+                    "article_summary_html": "<p>Summary</p>",
+                    "article_subtitle": "",
+                    "article_pub_utc": "2026-04-03T10:00:00+00:00",
+                    "article_image_url": "",
+                }
+            ],
+            {},
+        ),
     )
     monkeypatch.setattr(
         pipeline,
@@ -260,10 +263,10 @@ def test_main_fails_when_entry_reaches_retry_limit(
         lambda command_name: f"/usr/bin/{command_name}",
     )
 
-    def fake_sh(*args: object, env=None, cwd=None) -> str:
-        raise subprocess.CalledProcessError(1, [str(arg) for arg in args], "tts failed")
+    def fake_generate_episode(link: str) -> pathlib.Path:
+        raise RuntimeError("tts failed")
 
-    monkeypatch.setattr(pipeline, "sh", fake_sh)
+    monkeypatch.setattr(pipeline, "_generate_episode", fake_generate_episode)
 
     try:
         pipeline.main()
@@ -318,24 +321,27 @@ def test_main_skips_retry_exhausted_entry_on_scheduled_run(
     )
     monkeypatch.setattr(
         pipeline,
-        "fetch_entries_from_rss",
-        lambda: [
-            {
-                "article_title": "Example",
-                "article_link": "https://example.com/article",
-                "article_summary": "Summary",
-                "article_summary_html": "<p>Summary</p>",
-                "article_subtitle": "",
-                "article_pub_utc": "2026-04-03T10:00:00+00:00",
-                "article_image_url": "",
-            }
-        ],
+        "fetch_feed_entries",
+        lambda **kwargs: (
+            [
+                {
+                    "article_title": "Example",
+                    "article_link": "https://example.com/article",
+                    "article_summary": "Summary",
+                    "article_summary_html": "<p>Summary</p>",
+                    "article_subtitle": "",
+                    "article_pub_utc": "2026-04-03T10:00:00+00:00",
+                    "article_image_url": "",
+                }
+            ],
+            {},
+        ),
     )
 
-    def fail_if_called(*args: object, env=None, cwd=None) -> str:
+    def fail_if_called(link: str) -> pathlib.Path:
         raise AssertionError("Exhausted entry should not be retried on scheduled runs")
 
-    monkeypatch.setattr(pipeline, "sh", fail_if_called)
+    monkeypatch.setattr(pipeline, "_generate_episode", fail_if_called)
 
     pipeline.main()
 
@@ -367,18 +373,21 @@ def test_main_fails_fast_when_ffprobe_is_missing(
     monkeypatch.setattr(pipeline, "ia_has_episode_http", lambda identifier: False)
     monkeypatch.setattr(
         pipeline,
-        "fetch_entries_from_rss",
-        lambda: [
-            {
-                "article_title": "Example",
-                "article_link": "https://example.com/article",
-                "article_summary": "Summary",
-                "article_summary_html": "<p>Summary</p>",
-                "article_subtitle": "",
-                "article_pub_utc": "2026-04-03T10:00:00+00:00",
-                "article_image_url": "",
-            }
-        ],
+        "fetch_feed_entries",
+        lambda **kwargs: (
+            [
+                {
+                    "article_title": "Example",
+                    "article_link": "https://example.com/article",
+                    "article_summary": "Summary",
+                    "article_summary_html": "<p>Summary</p>",
+                    "article_subtitle": "",
+                    "article_pub_utc": "2026-04-03T10:00:00+00:00",
+                    "article_image_url": "",
+                }
+            ],
+            {},
+        ),
     )
     monkeypatch.setattr(
         pipeline,
@@ -427,18 +436,21 @@ def test_main_fails_fast_when_google_credentials_are_unusable(
     monkeypatch.setattr(pipeline, "ia_has_episode_http", lambda identifier: False)
     monkeypatch.setattr(
         pipeline,
-        "fetch_entries_from_rss",
-        lambda: [
-            {
-                "article_title": "Example",
-                "article_link": "https://example.com/article",
-                "article_summary": "Summary",
-                "article_summary_html": "<p>Summary</p>",
-                "article_subtitle": "",
-                "article_pub_utc": "2026-04-03T10:00:00+00:00",
-                "article_image_url": "",
-            }
-        ],
+        "fetch_feed_entries",
+        lambda **kwargs: (
+            [
+                {
+                    "article_title": "Example",
+                    "article_link": "https://example.com/article",
+                    "article_summary": "Summary",
+                    "article_summary_html": "<p>Summary</p>",
+                    "article_subtitle": "",
+                    "article_pub_utc": "2026-04-03T10:00:00+00:00",
+                    "article_image_url": "",
+                }
+            ],
+            {},
+        ),
     )
     monkeypatch.setattr(
         pipeline.shutil,
@@ -460,3 +472,20 @@ def test_main_fails_fast_when_google_credentials_are_unusable(
         match="Google credential sanity check failed: Unable to acquire impersonated credentials",
     ):
         pipeline.main()
+
+
+def test_http_session_caps_retry_after_for_kv_and_ia_reads() -> None:
+    """The pooled session must not obey an unbounded Retry-After.
+
+    Inputs: a fresh session from _build_http_session and a fake 429 response.
+    Outputs: None. Asserts the adapter's retry policy and the clamped wait.
+    Edge cases: backoff and Retry-After share the same RETRY_BACKOFF_MAX_S cap.
+    """
+
+    session = pipeline._build_http_session()
+    retry = session.get_adapter("https://api.cloudflare.com").max_retries
+    response = types.SimpleNamespace(status=429, headers={"Retry-After": "3600"})
+
+    assert retry.backoff_max == pipeline.RETRY_BACKOFF_MAX_S
+    assert retry.get_retry_after(response) == pipeline.RETRY_BACKOFF_MAX_S
+    assert "POST" not in retry.allowed_methods
@@ -0,0 +1,421 @@
+"""Tests for pipeline state bookkeeping helpers."""
+
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import sys
+import types
+from collections.abc import Callable, Collection, Sequence
+
+import pytest
+
+content_utils_stub = types.ModuleType("content_utils")
+content_utils_stub.resolve_article_content = lambda *args, **kwargs: ("", "", "", "")
+content_utils_stub.text_to_html = lambda text: text
+sys.modules.setdefault("content_utils", content_utils_stub)
+
+pipeline = __import__("pipeline")
+
+
+def test_update_latest_state_snapshot_candidate_matches_full_scan() -> None:
+    """Incremental snapshot updates should agree with the full item rescan.
+
+    Inputs: state with two items plus a newer candidate and an older candidate.
+    Outputs: legacy keys track the newest entry in both update modes.
+    Edge cases: an older candidate must not overwrite the newer snapshot.
+    """
+
+    older = {
+        "last_pub_utc": "2026-04-01T00:00:00+00:00",
+        "rss_added": True,
+        "uploaded_url": "https://archive.org/download/old/episode.mp3",
+    }
+    newer = {
+        "last_pub_utc": "2026-04-02T00:00:00+00:00",
+        "rss_added": True,
+        "uploaded_url": "https://archive.org/download/new/episode.mp3",
+    }
+    state: dict[str, object] = {"items": {"old": older}}
+    pipeline.update_latest_state_snapshot(state, older)
+    state["items"] = {"old": older, "new": newer}
+    pipeline.update_latest_state_snapshot(state, newer)
+    pipeline.update_latest_state_snapshot(state, older)
+
+    incremental = {key: state[key] for key in ("last_pub_utc", "uploaded_url")}
+    pipeline.rebuild_latest_state_snapshot(state)
+
+    assert incremental == {
+        "last_pub_utc": newer["last_pub_utc"],
+        "uploaded_url": newer["uploaded_url"],
+    }
+    assert state["uploaded_url"] == newer["uploaded_url"]
+
+
+def test_prune_state_items_keeps_newest_and_feed_entries() -> None:
+    """Pruning should cap state size without dropping entries still in the feed.
+
+    Inputs: four items, a cap of two, and one old identifier still in the feed.
+    Outputs: the two newest items plus the in-feed item survive.
+    Edge cases: items within the cap are left untouched.
+    """
+
+    items: dict[str, dict[str, object]] = {
+        f"id-{day}": {"last_pub_utc": f"2026-04-0{day}T00:00:00+00:00"}
+        for day in range(1, 5)
+    }
+
+    assert pipeline.prune_state_items(items, [], max_items=10) == 0
+    assert pipeline.prune_state_items(items, ["id-1"], max_items=2) == 1
+    assert sorted(items) == ["id-1", "id-3", "id-4"]
+
+
+def test_state_proves_published_requires_matching_pub_and_upload() -> None:
+    """Only fully recorded entries for the same pub date may skip the IA probe.
+
+    Inputs: recorded entry state compared against matching and newer pub dates.
+    Outputs: True for the exact recorded entry, False otherwise.
+    Edge cases: missing uploaded_url or missing state always requires a probe.
+    """
+
+    pub = "2026-04-03T10:00:00+00:00"
+    recorded = {
+        "rss_added": True,
+        "uploaded_url": "https://archive.org/download/x/episode.mp3",
+        "last_pub_utc": pub,
+    }
+
+    assert pipeline._state_proves_published(recorded, pub) is True
+    assert (
+        pipeline._state_proves_published(recorded, "2026-04-04T10:00:00+00:00") is False
+    )
+    assert (
+        pipeline._state_proves_published(recorded | {"uploaded_url": ""}, pub) is False
+    )
+    assert pipeline._state_proves_published(None, pub) is False
+
+
+def test_fetch_rss_payload_sends_validators_and_reports_not_modified() -> None:
+    """Conditional RSS fetches should send stored validators and surface 304s.
+
+    Inputs: stored ETag/Last-Modified validators and a fake 304 then 200 response.
+    Outputs: FeedNotModified for 304; fresh validators recorded after a 200.
+    Edge cases: the 200 response must replace validators from the earlier request.
+    """
+
+    sent_headers: list[dict[str, str]] = []
+
+    class FakeResponse:
+        """Minimal response stub carrying status, headers and body."""
+
+        def __init__(self, status_code: int, headers: dict[str, str]) -> None:
+            self.status_code = status_code
+            self.headers = headers
+            self.content = b"<rss/>"
+
+    responses = [
+        FakeResponse(304, {}),
+        FakeResponse(200, {"ETag": '"v2"', "Last-Modified": "Fri, 03 Apr 2026"}),
+    ]
+
+    def fake_http_get(url: str, headers: dict[str, str], timeout: object) -> object:
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    validators = {"etag": '"v1"', "last_modified": "Thu, 02 Apr 2026"}
+    with pytest.raises(pipeline.FeedNotModified):
+        pipeline._fetch_rss_payload(
+            "https://example.com/feed.xml",
+            http_get=fake_http_get,
+            request_validators=validators,
+        )
+
+    payload, error, response_validators = pipeline._fetch_rss_payload(
+        "https://example.com/feed.xml",
+        http_get=fake_http_get,
+        request_validators=validators,
+    )
+
+    assert sent_headers[0]["If-None-Match"] == '"v1"'
+    assert sent_headers[0]["If-Modified-Since"] == "Thu, 02 Apr 2026"
+    assert (payload, error) == (b"<rss/>", None)
+    assert response_validators == {
+        "etag": '"v2"',
+        "last_modified": "Fri, 03 Apr 2026",
+    }
+
+
+@pytest.fixture
+def fake_main_run(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> Callable[..., types.SimpleNamespace]:
+    """Install fakes around pipeline.main() for a run over brand-new feed entries.
+
+    Inputs: entry titles (oldest first) and the titles whose upload should raise.
+    Outputs: namespace with the call log, the live state, and state snapshots
+    written by persist_published_state ("published") and flush_state ("flushed").
+    Edge cases: every entry is synthesized (7 characters each); generation, upload,
+    feed writes, KV and deploys are all faked.
+    """
+
+    def install(
+        titles: Sequence[str], failing_uploads: Collection[str] = ()
+    ) -> types.SimpleNamespace:
+        run = types.SimpleNamespace(
+            calls=[],
+            state={"items": {}, "usage": {}, "pending_deploy": False},
+            published=[],
+            flushed=[],
+        )
+        entries = [
+            {
+                "article_title": title,
+                "article_link": f"https://example.com/{title}",
+                "article_summary": "Summary",
+                "article_summary_html": "",
+                "article_subtitle": "",
+                "article_pub_utc": f"2026-04-{day:02d}T10:00:00+00:00",
+                "article_image_url": "",
+            }
+            for day, title in enumerate(titles, start=1)
+        ]
+
+        def fake_generate_episode(link: str) -> pathlib.Path:
+            name = link.rsplit("/", 1)[-1]
+            run.calls.append(f"generate:{name}")
+            sidecar = tmp_path / f"{name}.json"
+            sidecar.write_text(
+                json.dumps(
+                    {
+                        "mp3_local_path": str(tmp_path / f"{name}.mp3"),
+                        "tts_characters": 7,
+                        "tts_generated": True,
+                    }
+                ),
+                encoding="utf-8",
+            )
+            return sidecar
+
+        def fake_upload_episode(mp3_path: str) -> str:
+            name = pathlib.Path(mp3_path).stem
+            run.calls.append(f"upload:{name}")
+            if name in failing_uploads:
+                raise RuntimeError(f"upload failed: {name}")
+            return f"https://archive.org/download/{name}/episode.mp3"
+
+        def fake_write_feed_item(audio_url: str, sidecar_path: object) -> None:
+            run.calls.append(f"rss:{audio_url.split('/')[-2]}")
+
+        def fake_kv_put_or_die(key: str, data: object) -> None:
+            run.calls.append("kv")
+            run.published.append(json.loads(json.dumps(data)))
+
+        def fake_kv_put(key: str, data: object) -> bool:
+            run.flushed.append(json.loads(json.dumps(data)))
+            return True
+
+        monkeypatch.setattr(pipeline, "RSS_URL", "https://example.com/feed.xml")
+        monkeypatch.setattr(pipeline, "ensure_kv_namespace_id", lambda: None)
+        monkeypatch.setattr(pipeline, "kv_get", lambda key: run.state)
+        monkeypatch.setattr(pipeline, "kv_put_or_die", fake_kv_put_or_die)
+        monkeypatch.setattr(pipeline, "kv_put", fake_kv_put)
+        monkeypatch.setattr(pipeline, "ia_has_episode_http", lambda identifier: False)
+        monkeypatch.setattr(
+            pipeline, "fetch_feed_entries", lambda **kwargs: (entries, {})
+        )
+        monkeypatch.setattr(
+            pipeline, "_ensure_audio_generation_environment_ready", lambda: None
+        )
+        monkeypatch.setattr(pipeline, "_generate_episode", fake_generate_episode)
+        monkeypatch.setattr(pipeline, "_upload_episode", fake_upload_episode)
+        monkeypatch.setattr(pipeline, "_write_feed_item", fake_write_feed_item)
+        monkeypatch.setattr(
+            pipeline, "deploy_pages", lambda state, feed_updated: (True, True)
+        )
+        return run
+
+    return install
+
+
+def test_main_overlaps_uploads_but_writes_feed_items_in_order(
+    fake_main_run: Callable[..., types.SimpleNamespace],
+) -> None:
+    """Uploads run in the background while RSS items are written in entry order.
+
+    Inputs: two new entries whose generation, upload and feed write are faked.
+    Outputs: both episodes uploaded and appended to the feed oldest-first.
+    Edge cases: the second generation starts before the first feed item is written;
+    state reaches KV after each feed write, not only at the end of the run.
+    """
+
+    run = fake_main_run(["first", "second"])
+
+    pipeline.main()
+
+    calls = run.calls
+    assert calls.index("generate:second") < calls.index("rss:first")
+    assert [call for call in calls if call.startswith("rss:")] == [
+        "rss:first",
+        "rss:second",
+    ]
+    assert "upload:first" in calls and "upload:second" in calls
+    items = run.state["items"]
+    assert isinstance(items, dict)
+    assert all(item["rss_added"] for item in items.values())
+    first_rss = calls.index("rss:first")
+    assert "kv" in calls[first_rss : calls.index("rss:second")]
+
+
+def test_main_counts_tts_usage_even_when_the_previous_upload_fails(
+    fake_main_run: Callable[..., types.SimpleNamespace],
+) -> None:
+    """Synthesized characters are recorded even if an overlapped upload fails.
+
+    Inputs: two new entries; the first entry's background upload raises.
+    Outputs: the run aborts with that error but usage counts both syntheses.
+    Edge cases: the second entry is synthesized before the failure surfaces.
+    """
+
+    run = fake_main_run(["first", "second"], failing_uploads={"first"})
+
+    with pytest.raises(RuntimeError, match="upload failed"):
+        pipeline.main()
+
+    assert run.flushed
+    assert run.flushed[-1]["usage"] == {"cumulative_characters": 14}
+
+
+def test_main_flushes_published_episodes_when_a_later_upload_fails(
+    fake_main_run: Callable[..., types.SimpleNamespace],
+) -> None:
+    """A background upload failure must not lose state for episodes already live.
+
+    Inputs: three new entries; only the second entry's upload raises.
+    Outputs: the run aborts with that error; the first episode was persisted as
+    published, and the final forced flush also carries the third synthesis.
+    Edge cases: the failure surfaces from the upload executor after the loop, so
+    only main()'s finally block can write the remaining dirty state.
+    """
+
+    run = fake_main_run(["first", "second", "third"], failing_uploads={"second"})
+
+    with pytest.raises(RuntimeError, match="upload failed: second"):
+        pipeline.main()
+
+    assert [call for call in run.calls if call.startswith("rss:")] == ["rss:first"]
+    first_id = pipeline.ia_identifier_for_link("https://example.com/first")
+    second_id = pipeline.ia_identifier_for_link("https://example.com/second")
+    assert run.published
+    assert run.published[-1]["items"][first_id]["rss_added"] is True
+    assert run.flushed
+    final_state = run.flushed[-1]
+    assert final_state["items"][first_id]["uploaded_url"] == (
+        "https://archive.org/download/first/episode.mp3"
+    )
+    assert not final_state["items"][second_id].get("rss_added")
+    assert final_state["usage"] == {"cumulative_characters": 21}
+
+
+def test_deploy_pages_skips_wrangler_when_only_mtimes_change(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    """A rebuilt Pages folder with identical bytes should not be redeployed.
+
+    Inputs: a deploy folder deployed once, then touched without content changes.
+    Outputs: Wrangler runs once; the retry is reported as skipped and successful.
+    Edge cases: a real content change after that must deploy again.
+    """
+
+    deploy_dir = tmp_path / "public"
+    (deploy_dir / "feeds").mkdir(parents=True)
+    feed = deploy_dir / "feeds" / "show.xml"
+    feed.write_text("<rss/>", encoding="utf-8")
+    (deploy_dir / "index.html").write_text("<html/>", encoding="utf-8")
+    wrangler_calls: list[tuple[str, ...]] = []
+    monkeypatch.setattr(pipeline, "PAGES_DEPLOY_DIR", str(deploy_dir))
+    monkeypatch.setattr(pipeline, "CF_API_TOKEN", "token")
+    monkeypatch.setattr(pipeline, "CF_PAGES_PROJECT", "project")
+    monkeypatch.setattr(pipeline, "resolve_wrangler_path", lambda: "wrangler")
+    monkeypatch.setattr(pipeline, "git_info", lambda: (None, None))
+    monkeypatch.setattr(pipeline, "sh", lambda *args: wrangler_calls.append(args))
+    state: dict[str, object] = {}
+
+    assert pipeline.deploy_pages(state, feed_updated=False) == (True, True)
+    stat = feed.stat()
+    os.utime(feed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert pipeline.deploy_pages(state, feed_updated=False) == (False, True)
+    assert len(wrangler_calls) == 1
+
+    feed.write_text("<rss>new</rss>", encoding="utf-8")
+    assert pipeline.deploy_pages(state, feed_updated=False) == (True, True)
+    assert len(wrangler_calls) == 2
+
+
+def test_kv_put_skips_bodies_matching_the_last_read_or_write(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Unchanged state should not be PUT to Cloudflare KV again.
+
+    Inputs: a fake KV GET returning state, then PUTs of equal and changed state.
+    Outputs: only the changed state reaches the HTTP layer, once.
+    Edge cases: key order differences do not count as a change.
+    """
+
+    put_bodies: list[bytes] = []
+
+    class FakeResponse:
+        """Minimal KV response stub."""
+
+        def __init__(self, status_code: int, content: bytes = b"") -> None:
+            self.status_code = status_code
+            self.content = content
+            self.text = ""
+
+    def fake_put(url: str, headers: object, data: bytes, timeout: object) -> object:
+        put_bodies.append(data)
+        return FakeResponse(200)
+
+    monkeypatch.setattr(pipeline, "kv_url", lambda key: f"https://kv.test/{key}")
+    monkeypatch.setattr(
+        pipeline._SESSION,
+        "get",
+        lambda url, headers, timeout: FakeResponse(200, b'{"b": 1, "a": 2}'),
+    )
+    monkeypatch.setattr(pipeline._SESSION, "put", fake_put)
+    monkeypatch.setattr(pipeline, "_kv_stored_digests", {})
+
+    state = pipeline.kv_get("feed:test")
+    assert state == {"a": 2, "b": 1}
+
+    assert pipeline.kv_put("feed:test", {"a": 2, "b": 1}) is True
+    assert pipeline.kv_put("feed:test", {"a": 3, "b": 1}) is True
+    assert pipeline.kv_put("feed:test", {"b": 1, "a": 3}) is True
+
+    assert len(put_bodies) == 1
+
+
+def test_usable_rss_validators_require_state_for_every_feed_entry() -> None:
+    """Stored validators are only sent while state still holds the whole feed.
+
+    Inputs: validators stored with the identifiers of the feed they describe.
+    Outputs: ETag/Last-Modified when every identifier has state, else None.
+    Edge cases: a reset entry (missing from items) and the legacy format without
+    identifiers both force an unconditional fetch.
+    """
+
+    stored = {
+        "etag": '"v1"',
+        "last_modified": "Thu, 02 Apr 2026",
+        pipeline.RSS_VALIDATORS_IDENTIFIERS_KEY: ["id-1", "id-2"],
+    }
+    items = {"id-1": {}, "id-2": {}, "id-old": {}}
+
+    assert pipeline._usable_rss_validators(stored, items) == {
+        "etag": '"v1"',
+        "last_modified": "Thu, 02 Apr 2026",
+    }
+    assert pipeline._usable_rss_validators(stored, {"id-1": {}}) is None
+    assert pipeline._usable_rss_validators({"etag": '"v1"'}, items) is None
+    assert pipeline._usable_rss_validators(None, items) is None
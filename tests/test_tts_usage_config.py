@@ -44,3 +44,41 @@ def test_tts_usage_uses_configured_billing_project(monkeypatch):
 
     assert module._billing_project_id() == "billing-runner-project"
     assert "`billing-project.dataset.table`" in module._render_sql()
+
+
+def test_fetch_tts_usage_reuses_fresh_disk_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("BILLING_EXPORT_TABLE", "billing-project.dataset.table")
+    monkeypatch.setenv("TTS_USAGE_CACHE", str(tmp_path))
+    module = import_tts_usage(monkeypatch)
+    report = {
+        "summary": {"characters": 5, "free_tier_remaining": 7},
+        "by_group": [],
+        "daily": [],
+    }
+    calls = []
+
+    def fake_query(client=None):
+        calls.append(client)
+        return report
+
+    monkeypatch.setattr(module, "_query_tts_usage", fake_query)
+
+    assert module.fetch_tts_usage() == report
+    assert module.fetch_tts_usage() == report
+    assert len(calls) == 1
+
+    assert module.fetch_tts_usage(use_cache=False) == report
+    assert len(calls) == 2
+
+
+def test_print_table_keeps_every_column_of_uneven_rows(monkeypatch, capsys):
+    monkeypatch.setenv("BILLING_EXPORT_TABLE", "billing-project.dataset.table")
+    module = import_tts_usage(monkeypatch)
+
+    module._print_table(["sku", "chars"], [["wavenet"], ["neural2", 1234, "extra"]])
+
+    assert capsys.readouterr().out.splitlines() == [
+        "sku      chars",
+        "wavenet",
+        "neural2  1234   extra",
+    ]
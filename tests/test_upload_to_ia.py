@@ -1,13 +1,18 @@
-"""Tests for Internet Archive session setup logging."""
+"""Tests for Internet Archive session setup and upload helpers."""
 
 from __future__ import annotations
 
+import http.server
 import importlib
 import sys
+import threading
 import types
 from typing import Any
 
 import pytest
+import requests
+import urllib3.util.retry
+from requests.adapters import HTTPAdapter
 
 
 @pytest.fixture
@@ -62,6 +67,12 @@ def test_get_ia_session_uses_env_credentials_without_logging_source(
         "s3": {"access": "test-access-key", "secret": "test-secret-key"}
     }
     assert recorded_call["config_file"] == ""
+    adapter_kwargs = recorded_call["http_adapter_kwargs"]
+    assert isinstance(adapter_kwargs, dict)
+    retry = adapter_kwargs["max_retries"]
+    assert 429 in retry.status_forcelist
+    assert "PUT" not in retry.allowed_methods
+    assert retry.respect_retry_after_header is True
     assert "env vars" not in capsys.readouterr().out
 
 
@@ -103,3 +114,156 @@ def test_get_ia_session_falls_back_without_logging_local_config_source(
     output = capsys.readouterr().out
     assert "Initializing Internet Archive session" in output
     assert "default IA config" not in output
+
+
+def test_run_reports_replacing_from_item_files(
+    monkeypatch: Any, capsys: Any, tmp_path: Any, upload_to_ia_module: Any
+) -> None:
+    """run() should read existing IA file names from the fetched item metadata.
+
+    Inputs: an MP3 with sidecar and a fake item that already holds episode.mp3.
+    Outputs: the download URL; stdout reports the upload as a replacement.
+    Edge cases: metadata is fetched with a single get_item call; retries belong to
+    the session's adapter, not to run().
+    """
+
+    mp3_path = tmp_path / "episode.mp3"
+    mp3_path.write_bytes(b"ID3")
+    (tmp_path / "episode.mp3.rssmeta.json").write_text(
+        '{"article_link": "https://example.com/a", "article_title": "A"}',
+        encoding="utf-8",
+    )
+    identifier = upload_to_ia_module.link_id("https://example.com/a")
+
+    class FakeItem:
+        files = ({"name": "cover.jpg"}, {"name": "episode.mp3"})
+
+        def upload(self, files: object, **kwargs: object) -> list[object]:
+            return [types.SimpleNamespace(ok=True)]
+
+    metadata_fetches: list[str] = []
+
+    class FakeSession:
+        def get_item(self, item_identifier: str, **kwargs: object) -> FakeItem:
+            metadata_fetches.append(item_identifier)
+            return FakeItem()
+
+    url = upload_to_ia_module.run(mp3_path, session=FakeSession())
+
+    assert url == f"https://archive.org/download/{identifier}/episode.mp3"
+    assert metadata_fetches == [identifier]
+    assert f"Replacing episode.mp3 in {identifier}" in capsys.readouterr().out
+
+
+def test_metadata_retry_caps_retry_after_and_attempts(
+    monkeypatch: Any, capsys: Any, upload_to_ia_module: Any
+) -> None:
+    """A 503 with a huge Retry-After should be retried a bounded number of times.
+
+    Inputs: a local server that always answers 503 with Retry-After: 3600.
+    Outputs: None. Asserts the request count, the clamped sleeps and the retry logs.
+    Edge cases: raise_on_status=False hands the final 503 back instead of raising.
+    """
+
+    hits: list[str] = []
+
+    class Unavailable(http.server.BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Retry-After", "3600")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: object) -> None:
+            return None
+
+    sleeps: list[float] = []
+    monkeypatch.setattr(urllib3.util.retry.time, "sleep", sleeps.append)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Unavailable)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    retry = upload_to_ia_module.metadata_retry()
+    try:
+        with requests.Session() as session:
+            session.mount("http://", HTTPAdapter(max_retries=retry))
+            response = session.get(
+                f"http://127.0.0.1:{server.server_port}/metadata/x", timeout=5
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.status_code == 503
+    assert len(hits) == retry.total + 1
+    assert sleeps == [retry.backoff_max] * retry.total
+    assert capsys.readouterr().out.count("[http] GET") == retry.total
+
+
+def test_upload_many_keeps_order_and_isolates_failures(
+    monkeypatch: Any, upload_to_ia_module: Any
+) -> None:
+    """Parallel uploads should report every outcome in input order.
+
+    Inputs: three paths where the middle upload raises SystemExit.
+    Outputs: URLs for the good paths and the exception for the failed one.
+    Edge cases: run()'s SystemExit must not abort the remaining uploads.
+    """
+
+    def fake_run(mp3_path: Any, *, session: Any = None) -> str:
+        if mp3_path.name == "bad.mp3":
+            raise SystemExit("Internet Archive upload failed")
+        return f"https://archive.org/download/{mp3_path.stem}/episode.mp3"
+
+    monkeypatch.setattr(upload_to_ia_module, "run", fake_run)
+    paths = [
+        upload_to_ia_module.pathlib.Path(name) for name in ("a.mp3", "bad.mp3", "c.mp3")
+    ]
+
+    results = upload_to_ia_module.upload_many(paths, max_workers=3)
+
+    assert [path.name for path, _ in results] == ["a.mp3", "bad.mp3", "c.mp3"]
+    assert results[0][1] == "https://archive.org/download/a/episode.mp3"
+    assert isinstance(results[1][1], SystemExit)
+    assert results[2][1] == "https://archive.org/download/c/episode.mp3"
+
+
+def test_upload_many_builds_sessions_in_workers_and_reports_failures_per_path(
+    monkeypatch: Any, upload_to_ia_module: Any
+) -> None:
+    """IA sessions should be built inside the pool, at most one per worker.
+
+    Inputs: five paths, two workers and a get_ia_session whose first call fails.
+    Outputs: None. Asserts session counts and per-path outcomes.
+    Edge cases: the failed session build is reported for its path only, and the
+    worker that hit it builds a fresh session for its next upload.
+    """
+
+    lock = threading.Lock()
+    created: list[object] = []
+    main_thread = threading.current_thread()
+
+    def fake_get_ia_session() -> object:
+        assert threading.current_thread() is not main_thread
+        with lock:
+            created.append(threading.current_thread().name)
+            if len(created) == 1:
+                raise ConnectionError("archive.org unreachable")
+        return object()
+
+    def fake_run(mp3_path: Any, *, session: Any = None) -> str:
+        assert session is not None
+        return f"https://archive.org/download/{mp3_path.stem}/episode.mp3"
+
+    monkeypatch.setattr(upload_to_ia_module, "get_ia_session", fake_get_ia_session)
+    monkeypatch.setattr(upload_to_ia_module, "run", fake_run)
+    paths = [upload_to_ia_module.pathlib.Path(f"{name}.mp3") for name in "abcde"]
+
+    results = upload_to_ia_module.upload_many(paths, max_workers=2)
+
+    failures = [outcome for _, outcome in results if isinstance(outcome, Exception)]
+    assert [path for path, _ in results] == paths
+    assert len(failures) == 1
+    assert isinstance(failures[0], ConnectionError)
+    # One failed build plus at most one live session per worker.
+    assert len(created) <= 3
@@ -240,3 +240,125 @@ def test_add_item_replaces_existing_article_when_audio_url_changes(
         enclosure_element.get("url")
         == "https://archive.org/download/tts-geektime-abc/episode.mp3"
     )
+
+
+def test_run_accepts_in_memory_payload_without_mutating_it(
+    tmp_path: pathlib.Path, monkeypatch
+) -> None:
+    """run() should take an episode mapping directly, as the pipeline restore path does.
+
+    Inputs: a feed entry mapping without audio_url plus the public audio URL.
+    Outputs: the feed gains one item pointing at the audio URL.
+    Edge cases: the caller's mapping is left untouched (no audio_url added).
+    """
+
+    feed_path = tmp_path / "feeds" / "geektime.xml"
+    monkeypatch.setenv("FEED_PATH", str(feed_path))
+    monkeypatch.setattr(write_rss_module, "get_len", lambda url: 0)
+    audio_url = "https://archive.org/download/tts-geektime-abc/episode.mp3"
+    entry = dict(build_episode_payload(audio_url=audio_url))
+    del entry["audio_url"]
+
+    assert write_rss_module.run(audio_url, entry) == str(feed_path)
+
+    assert "audio_url" not in entry
+    item_elements = parse_feed_item_elements(feed_path)
+    assert len(item_elements) == 1
+    enclosure_element = item_elements[0].find("enclosure")
+    assert enclosure_element is not None
+    assert enclosure_element.get("url") == audio_url
+
+
+def test_add_item_uses_recorded_audio_bytes_without_head_request(
+    tmp_path: pathlib.Path, monkeypatch
+) -> None:
+    """A payload carrying audio_bytes should not trigger a Content-Length HEAD.
+
+    Inputs: an episode payload with audio_bytes set and a get_len that fails.
+    Outputs: the enclosure length equals the recorded byte count.
+    Edge cases: payloads without audio_bytes still fall back to get_len.
+    """
+
+    def fail_get_len(url: str) -> int:
+        raise AssertionError("HEAD should not be needed")
+
+    feed_path = tmp_path / "feeds" / "geektime.xml"
+    monkeypatch.setattr(write_rss_module, "get_len", fail_get_len)
+    payload = build_episode_payload(
+        audio_url="https://archive.org/download/tts-geektime-abc/episode.mp3"
+    )
+    payload["audio_bytes"] = 12345
+
+    add_item(str(feed_path), build_channel_meta(), payload)
+
+    enclosure_element = parse_feed_item_elements(feed_path)[0].find("enclosure")
+    assert enclosure_element is not None
+    assert enclosure_element.get("length") == "12345"
+
+
+def test_valid_itunes_image_accepts_only_http_jpg_or_png_paths() -> None:
+    """Episode images must be http(s) URLs whose path ends in .jpg or .png.
+
+    Inputs: URLs varying scheme, extension case, query/fragment and authority.
+    Outputs: True only for http(s) URLs with a .jpg/.png path.
+    Edge cases: an extension in the host, query or fragment does not count.
+    """
+
+    valid = write_rss_module._valid_itunes_image
+    assert valid("https://example.com/cover.jpg")
+    assert valid("HTTP://example.com/a/cover.PNG?width=600#top")
+    assert not valid("")
+    assert not valid(None)
+    assert not valid("ftp://example.com/cover.jpg")
+    assert not valid("https://example.com/cover.jpeg")
+    assert not valid("https://cover.jpg")
+    assert not valid("https://example.com/?cover.jpg")
+    assert not valid("https://example.com/#cover.png")
+
+
+def test_add_items_adds_a_batch_in_one_write_and_replaces_matches(
+    tmp_path: pathlib.Path, monkeypatch
+) -> None:
+    """A batch add should behave like repeated add_item calls in one rewrite.
+
+    Inputs: a feed holding one article, then a batch re-adding it plus a new one.
+    Outputs: two items; the re-added article points at its new audio URL.
+    Edge cases: the replaced article is not duplicated by the batch.
+    """
+
+    feed_path = tmp_path / "feeds" / "geektime.xml"
+    channel_meta = build_channel_meta()
+    monkeypatch.setattr(write_rss_module, "get_len", lambda url: 0)
+    add_item(
+        str(feed_path),
+        channel_meta,
+        build_episode_payload(audio_url="https://archive.org/download/old/episode.mp3"),
+    )
+    other = build_episode_payload(
+        audio_url="https://archive.org/download/other/episode.mp3"
+    )
+    other["article_title"] = "Other Article"
+    other["article_link"] = "https://www.geektime.co.il/other-article/"
+
+    write_rss_module.add_items(
+        str(feed_path),
+        channel_meta,
+        [
+            build_episode_payload(
+                audio_url="https://archive.org/download/new/episode.mp3"
+            ),
+            other,
+        ],
+    )
+
+    urls = sorted(
+        element.get("url")
+        for element in (
+            item.find("enclosure") for item in parse_feed_item_elements(feed_path)
+        )
+        if element is not None
+    )
+    assert urls == [
+        "https://archive.org/download/new/episode.mp3",
+        "https://archive.org/download/other/episode.mp3",
+    ]
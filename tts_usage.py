@@ -2,7 +2,16 @@
 
 from __future__ import annotations
 
+import argparse
+import atexit
+import datetime
+import functools
+import hashlib
+import itertools
+import time
 import pathlib
+import sys
+import threading
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import (
@@ -22,12 +31,18 @@ import os
 from google.cloud import bigquery
 from google.cloud.bigquery.table import Row as BigQueryRow
 
+import json_utils
+
 
 SQL_TEMPLATE_PATH = pathlib.Path(__file__).with_name("tts_usage.sql")
 BILLING_EXPORT_TABLE_ENV_NAME = "BILLING_EXPORT_TABLE"
 BILLING_PROJECT_ENV_NAME = "TTS_BILLING_PROJECT_ID"
 FREE_TIER_STANDARD = int(os.environ.get("FREE_TIER_STANDARD", "4000000"))
 FREE_TIER_PREMIUM = int(os.environ.get("FREE_TIER_PREMIUM", "1000000"))
+CACHE_DIR_ENV_NAME = "TTS_USAGE_CACHE"
+CACHE_TTL_ENV_NAME = "TTS_USAGE_CACHE_TTL"
+DEFAULT_CACHE_DIR = "~/.cache/tts_usage"
+DEFAULT_CACHE_TTL_S = 3600
 
 
 def _billing_export_table() -> str:
@@ -50,12 +65,33 @@ def _billing_project_id() -> str | None:
     )
 
 
+@functools.lru_cache(maxsize=1)
+def _sql_template() -> str:
+    """Read the billing SQL template once per process."""
+    return SQL_TEMPLATE_PATH.read_text(encoding="utf-8")
+
+
 def _render_sql() -> str:
-    """Render the billing SQL from current environment config."""
-    return SQL_TEMPLATE_PATH.read_text(encoding="utf-8").format(
-        billing_export_table=_billing_export_table(),
-        free_tier_premium=FREE_TIER_PREMIUM,
-        free_tier_standard=FREE_TIER_STANDARD,
+    """Render the billing SQL from current environment config.
+
+    Only the table name is substituted (BigQuery cannot parameterize identifiers);
+    the free-tier limits are bound as query parameters by _query_job_config().
+    """
+    return _sql_template().format(billing_export_table=_billing_export_table())
+
+
+def _query_job_config() -> bigquery.QueryJobConfig:
+    """Bind the free-tier limits so the SQL text stays identical across configs."""
+    return bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter(
+                "free_tier_premium", "INT64", FREE_TIER_PREMIUM
+            ),
+            bigquery.ScalarQueryParameter(
+                "free_tier_standard", "INT64", FREE_TIER_STANDARD
+            ),
+        ],
+        use_query_cache=True,
     )
 
 
@@ -118,33 +154,107 @@ def _optional_int(value: Optional[Numeric]) -> Optional[int]:
 
 def _rows_from_query(result: Iterable[BigQueryRow]) -> List[UsageRow]:
     """Turn the BigQuery response into friendly UsageRow objects."""
-    rows: List[UsageRow] = []
-    for row in result:
-        section = cast(str, row["section"])
-        label = cast(Optional[str], row["label"])
-        characters_value = cast(Optional[Numeric], row["characters"])
-        free_tier_value = cast(Optional[Numeric], row["free_tier_remaining"])
-        rows.append(
-            UsageRow(
-                section=section,
-                label=label,
-                characters=_int_or_zero(characters_value),
-                free_tier_remaining=_optional_int(free_tier_value),
-            )
+    # Columns are read by name so the SQL may reorder its SELECT list freely.
+    return [
+        UsageRow(
+            section=cast(str, row["section"]),
+            label=cast(Optional[str], row["label"]),
+            characters=_int_or_zero(cast(Optional[Numeric], row["characters"])),
+            free_tier_remaining=_optional_int(
+                cast(Optional[Numeric], row["free_tier_remaining"])
+            ),
         )
-    return rows
+        for row in result
+    ]
+
+
+_client_lock = threading.Lock()
+_default_client: bigquery.Client | None = None
+
+
+def _shared_client() -> bigquery.Client:
+    """Return the process-wide BigQuery client, creating it on first use.
+
+    Inputs: billing project from the environment (read once, at creation).
+    Outputs: a client reused by every later query in this process.
+    Edge cases: creation is double-checked under a lock so concurrent callers share
+    one client; it is closed at interpreter exit.
+    """
+    global _default_client
+    if _default_client is None:
+        with _client_lock:
+            if _default_client is None:
+                _default_client = bigquery.Client(project=_billing_project_id())
+                atexit.register(_default_client.close)
+    return _default_client
+
+
+def _cache_path() -> pathlib.Path:
+    """Return today's cache file for the configured table and free-tier limits.
+
+    Inputs: BILLING_EXPORT_TABLE, FREE_TIER_* and TTS_USAGE_CACHE from the environment.
+    Outputs: ``<cache dir>/<YYYYMMDD>-<config digest>.json``.
+    Edge cases: the digest keeps feeds with different billing tables or limits from
+    reading each other's cached reports.
+    """
+    cache_dir = pathlib.Path(
+        os.environ.get(CACHE_DIR_ENV_NAME, "").strip() or DEFAULT_CACHE_DIR
+    ).expanduser()
+    config = f"{_billing_export_table()}|{FREE_TIER_PREMIUM}|{FREE_TIER_STANDARD}"
+    digest = hashlib.blake2b(config.encode(), digest_size=6).hexdigest()
+    return cache_dir / f"{datetime.date.today():%Y%m%d}-{digest}.json"
+
+
+def _cache_ttl_s() -> float:
+    """Return the cache TTL in seconds (invalid values fall back to the default)."""
+    raw_value = os.environ.get(CACHE_TTL_ENV_NAME, "").strip()
+    try:
+        return float(raw_value) if raw_value else DEFAULT_CACHE_TTL_S
+    except ValueError:
+        return DEFAULT_CACHE_TTL_S
 
 
-def fetch_tts_usage(client: Optional[bigquery.Client] = None) -> UsageReport:
-    """Run the billing SQL so pipeline.py can update stats and CLI can print them."""
-    provided_client = client is not None
-    client = client or bigquery.Client(project=_billing_project_id())
+def _read_cached_report(path: pathlib.Path) -> UsageReport | None:
+    """Return the cached report when it exists and is younger than the TTL."""
     try:
-        query_job = client.query(_render_sql())
-        rows = _rows_from_query(query_job.result())
-    finally:
-        if not provided_client:
-            client.close()
+        if time.time() - path.stat().st_mtime > _cache_ttl_s():
+            return None
+        return cast(UsageReport, json_utils.loads(path.read_bytes()))
+    except (OSError, ValueError):
+        return None
+
+
+def fetch_tts_usage(
+    client: bigquery.Client | None = None, *, use_cache: bool = True
+) -> UsageReport:
+    """Return this invoice month's TTS usage, served from a short-lived disk cache.
+
+    Inputs: optional BigQuery client; use_cache=False forces a fresh query.
+    Outputs: UsageReport with summary, per-group and daily rows.
+    Edge cases: an explicit client always queries live; cache read/write failures
+    fall back to (or keep) the live result.
+    """
+    if client is not None or not use_cache:
+        return _query_tts_usage(client)
+
+    cache_path = _cache_path()
+    cached = _read_cached_report(cache_path)
+    if cached is not None:
+        return cached
+    report = _query_tts_usage(None)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        json_utils.write_json_atomic(cache_path, report)
+    except OSError as exc:
+        print(f"[tts_usage] Could not write cache {cache_path}: {exc}")
+    return report
+
+
+def _query_tts_usage(client: Optional[bigquery.Client] = None) -> UsageReport:
+    """Run the billing SQL so pipeline.py can update stats and CLI can print them."""
+    client = client or _shared_client()
+    query_job = client.query(_render_sql(), job_config=_query_job_config())
+    rows = _rows_from_query(query_job.result())
 
     summary = next((r for r in rows if r.section == "summary_total"), None)
     by_group = [r for r in rows if r.section == "by_group"]
@@ -175,22 +285,19 @@ def fetch_tts_usage(client: Optional[bigquery.Client] = None) -> UsageReport:
 
 def _print_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]) -> None:
     """Pretty-print tabular data for the CLI report."""
-    # rows = list of iterables (strings or numbers)
-    string_rows: List[List[str]] = [[str(c) for c in r] for r in rows]
-    widths = [len(h) for h in headers]
-    for r in string_rows:
-        for i, c in enumerate(r):
-            if i < len(widths):
-                widths[i] = max(widths[i], len(c))
-            else:
-                widths.append(len(c))
+    # rows = list of iterables (strings or numbers); short or long rows are fine
+    string_rows: List[List[str]] = [list(map(str, r)) for r in rows]
+    widths = [
+        max(map(len, col))
+        for col in itertools.zip_longest(headers, *string_rows, fillvalue="")
+    ]
 
     def fmt(row: Sequence[str]) -> str:
-        return "  ".join(f"{val:<{widths[i]}}" for i, val in enumerate(row))
+        return "  ".join(val.ljust(width) for val, width in zip(row, widths))
 
-    print(fmt(headers))
-    for r in string_rows:
-        print(fmt(r))
+    lines = [fmt(headers)]
+    lines.extend(fmt(r) for r in string_rows)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def print_usage_report(data: Mapping[str, Any]) -> None:
@@ -235,7 +342,14 @@ def print_usage_report(data: Mapping[str, Any]) -> None:
 
 def main():
     """CLI entry point for ad-hoc inspection."""
-    data = fetch_tts_usage()
+    parser = argparse.ArgumentParser(description="Show this month's TTS usage.")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Query BigQuery even if today's cached report is still fresh",
+    )
+    args = parser.parse_args()
+    data = fetch_tts_usage(use_cache=not args.no_cache)
     print_usage_report(data)
 
 
@@ -24,8 +24,8 @@ by_group AS (
   GROUP BY 1
 ),
 limits AS (
-  SELECT 'wavenet_or_neural2' AS voice_group, CAST({free_tier_premium} AS NUMERIC) AS free_tier_chars UNION ALL
-  SELECT 'standard', CAST({free_tier_standard} AS NUMERIC) UNION ALL
+  SELECT 'wavenet_or_neural2' AS voice_group, CAST(@free_tier_premium AS NUMERIC) AS free_tier_chars UNION ALL
+  SELECT 'standard', CAST(@free_tier_standard AS NUMERIC) UNION ALL
   SELECT 'other', CAST(0 AS NUMERIC)
 ),
 group_with_limits AS (
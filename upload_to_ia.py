@@ -4,19 +4,27 @@
 from __future__ import annotations
 
 import hashlib
-import json
 import os
 import pathlib
 import random
+import re
 import sys
+import threading
 import time
-from typing import Any, Iterable, Mapping, MutableMapping, Protocol, Sequence, cast
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Mapping, MutableMapping, Protocol, Sequence, cast
 
 import internetarchive
 import requests
 
+import json_utils
+from http_retry import RETRY_BACKOFF_MAX_S, CappedRetry
+
 SLUG = os.getenv("PODCAST_SLUG", "default").strip()
 IA_ID_PREFIX = os.getenv("IA_ID_PREFIX", SLUG).strip() or SLUG
+_SLOW_DOWN_RE = re.compile(rb"slow down|reduce your request rate", re.IGNORECASE)
+SLOW_DOWN_SCAN_BYTES = 4096
+DEFAULT_IA_PARALLEL = 6
 
 
 class UploadResponse(Protocol):
@@ -25,15 +33,12 @@ class UploadResponse(Protocol):
     ok: bool
 
 
-class ArchiveFile(Protocol):
-    """Protocol describing the file objects returned by internetarchive."""
-
-    name: str
-
-
 class ArchiveItem(Protocol):
     """Minimal surface from internetarchive.Item that we actually call."""
 
+    # Raw per-file metadata dicts from the item's metadata response.
+    files: list[dict[str, Any]]
+
     def upload(
         self,
         files: Mapping[str, str],
@@ -43,8 +48,6 @@ class ArchiveItem(Protocol):
         request_kwargs: Mapping[str, Any] | None = None,
     ) -> Sequence[UploadResponse]: ...
 
-    def get_files(self) -> Iterable[ArchiveFile]: ...
-
 
 class ArchiveSession(Protocol):
     """internetarchive.get_session interface (real or mocked)."""
@@ -99,9 +102,10 @@ def retry_delay(attempt: int, response: requests.Response | None) -> float:
     limits. Adds a little jitter so concurrent uploads do not retry in lockstep.
     """
     base = min(10 * (2 ** (attempt - 1)), 300)
-    body = getattr(response, "text", "") if response is not None else ""
-    slow_down = isinstance(body, str) and (
-        "slow down" in body.lower() or "reduce your request rate" in body.lower()
+    body = getattr(response, "content", b"") if response is not None else b""
+    # IA's S3-style error documents are short; the phrase sits near the top.
+    slow_down = isinstance(body, bytes) and bool(
+        _SLOW_DOWN_RE.search(body, 0, SLOW_DOWN_SCAN_BYTES)
     )
     if slow_down:
         # Start at 5 minutes and double, capped at 20 minutes, when IA tells us to back off.
@@ -123,7 +127,14 @@ def wait_with_progress(seconds: float) -> None:
     if remaining <= 0:
         return
     print(f"Waiting {remaining:.1f}s before retry...", flush=True)
-    interval = 10.0 if remaining > 30 else 5.0
+    # IA slow-down waits run 5-20 minutes; a tick per minute keeps them visible
+    # without waking up (and flushing stdout) every few seconds.
+    if remaining > 300:
+        interval = 60.0
+    elif remaining > 30:
+        interval = 10.0
+    else:
+        interval = 5.0
     while remaining > 0:
         sleep_for = min(interval, remaining)
         time.sleep(sleep_for)
@@ -174,44 +185,12 @@ def upload_with_retries(
     raise RuntimeError("upload_with_retries exhausted without returning or raising")
 
 
-def get_item_with_retries(
-    session: ArchiveSession,
-    identifier: str,
-    *,
-    max_attempts: int,
-    request_kwargs: Mapping[str, Any],
-) -> ArchiveItem:
-    """Fetch item metadata with retries so occasional IA timeouts don't fail the pipeline."""
-    for attempt in range(1, max_attempts + 1):
-        try:
-            print(
-                f"Metadata attempt {attempt}/{max_attempts} with timeout "
-                f"{request_kwargs.get('timeout', 'default')}...",
-                flush=True,
-            )
-            return session.get_item(identifier, request_kwargs=dict(request_kwargs))
-        except requests.exceptions.RequestException as exc:
-            if not should_retry(exc) or attempt == max_attempts:
-                raise
-            response: requests.Response | None = getattr(exc, "response", None)
-            status = getattr(response, "status_code", "?")
-            wait = retry_delay(attempt, response)
-            print(
-                f"Metadata attempt {attempt} failed with status {status}: {exc}. "
-                f"Retrying in {wait:.1f}s...",
-                flush=True,
-            )
-            wait_with_progress(wait)
-    raise RuntimeError("get_item_with_retries exhausted without returning or raising")
-
-
 def read_sidecar(mp3_path: pathlib.Path) -> dict[str, Any]:
     """Load the JSON metadata produced alongside the MP3."""
     sidecar = mp3_path.with_suffix(mp3_path.suffix + ".rssmeta.json")
     if not sidecar.exists():
-        sys.exit(f"Sidecar not found: {sidecar}")
-    with open(sidecar, "r", encoding="utf-8") as f:
-        return json.load(f)
+        raise SystemExit(f"Sidecar not found: {sidecar}")
+    return json_utils.loads(sidecar.read_bytes())
 
 
 def link_id(link: str) -> str:
@@ -220,6 +199,31 @@ def link_id(link: str) -> str:
     return f"tts-{IA_ID_PREFIX}-{h}"
 
 
+def metadata_retry() -> CappedRetry:
+    """Build the urllib3 retry policy for the archive.org metadata adapter.
+
+    Inputs: none.
+    Outputs: CappedRetry covering RETRYABLE_STATUS_CODES, connection errors and
+    read timeouts, with Retry-After clamped to RETRY_BACKOFF_MAX_S.
+    Edge cases: this is the only retry layer for metadata reads (run() calls
+    get_item once), so at most total + 1 requests go out per item. Only GET/HEAD
+    are replayed; internetarchive mounts this adapter on archive.org but not on
+    s3.us.archive.org, so uploads keep upload_with_retries and its slow-down
+    handling. raise_on_status=False hands the last response back so the library's
+    raise_for_status still surfaces the real HTTP error.
+    """
+    return CappedRetry(
+        total=3,
+        redirect=False,
+        backoff_factor=2,
+        backoff_max=RETRY_BACKOFF_MAX_S,
+        status_forcelist=sorted(RETRYABLE_STATUS_CODES),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
 def get_ia_session() -> ArchiveSession:
     """Build the IA session without logging the concrete credential source.
 
@@ -233,20 +237,74 @@ def get_ia_session() -> ArchiveSession:
     ak = os.getenv("IA_ACCESS_KEY")
     sk = os.getenv("IA_SECRET_KEY")
     print("Initializing Internet Archive session", flush=True)
+    adapter_kwargs: dict[str, Any] = {"max_retries": metadata_retry()}
     if ak and sk:
-        return get_session(config={"s3": {"access": ak, "secret": sk}}, config_file="")
-    return get_session(config_file="")
+        return get_session(
+            config={"s3": {"access": ak, "secret": sk}},
+            config_file="",
+            http_adapter_kwargs=adapter_kwargs,
+        )
+    return get_session(config_file="", http_adapter_kwargs=adapter_kwargs)
 
 
-def main() -> None:
-    """CLI entry point invoked by pipeline.py right before RSS regeneration."""
-    if len(sys.argv) < 2:
-        print("Usage: python upload_to_ia.py path/to/file.mp3")
-        sys.exit(2)
+_session_lock = threading.Lock()
+_shared_session: ArchiveSession | None = None
+
+
+def shared_ia_session() -> ArchiveSession:
+    """Return the process-wide IA session, creating it on first use.
+
+    Inputs: IA credentials from the environment (read once, at creation).
+    Outputs: session whose config, credentials and retry adapters are reused by later
+    run() calls.
+    Edge cases: internetarchive sends "Connection: close" on every request, so TCP/TLS
+    connections are not reused between calls. Creation is double-checked under a
+    lock, but the session must only be used from one thread at a time (pipeline.py
+    uploads on a single worker); upload_many gives each worker its own session
+    because requests sessions are not thread-safe.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _session_lock:
+            if _shared_session is None:
+                _shared_session = get_ia_session()
+    return _shared_session
+
+
+_worker_sessions = threading.local()
+
+
+def _worker_ia_session() -> ArchiveSession:
+    """Return the calling upload worker's own IA session.
 
-    mp3_path = pathlib.Path(sys.argv[1]).resolve()
+    Inputs: IA credentials from the environment (read when the session is created).
+    Outputs: a session from get_ia_session, created on first use per thread.
+    Edge cases: a failed creation is not cached, so it surfaces as that upload's
+    error and the worker's next upload tries again.
+    """
+    session = getattr(_worker_sessions, "session", None)
+    if session is None:
+        session = get_ia_session()
+        _worker_sessions.session = session
+    return session
+
+
+def _run_in_worker(mp3_path: pathlib.Path) -> str:
+    """Upload one MP3 from an upload_many worker using that worker's session."""
+    return run(mp3_path, session=_worker_ia_session())
+
+
+def run(mp3_path: pathlib.Path, *, session: ArchiveSession | None = None) -> str:
+    """Upload one MP3 (described by its sidecar) and return the public download URL.
+
+    Inputs: path to a generated MP3 with a ``.mp3.rssmeta.json`` sidecar next to it;
+    optional IA session (defaults to the shared per-process one).
+    Outputs: archive.org download URL for the uploaded episode.
+    Edge cases: raises SystemExit for missing files or when IA reports a failed upload.
+    """
+    mp3_path = mp3_path.resolve()
     if not mp3_path.is_file():
-        sys.exit(f"Not found: {mp3_path}")
+        raise SystemExit(f"Not found: {mp3_path}")
 
     meta: dict[str, Any] = read_sidecar(mp3_path)
     identifier = link_id(meta["article_link"])
@@ -270,16 +328,17 @@ def main() -> None:
         flush=True,
     )
 
-    session = get_ia_session()
-    item: ArchiveItem = get_item_with_retries(
-        session,
-        identifier,
-        max_attempts=max_attempts,
-        request_kwargs=request_kwargs,
+    if session is None:
+        session = shared_ia_session()
+    # Metadata reads are retried by the session's archive.org adapter (metadata_retry).
+    item: ArchiveItem = session.get_item(
+        identifier, request_kwargs=dict(request_kwargs)
     )
 
     try:
-        replacing = any(f.name == remote_name for f in item.get_files())
+        # item.files is already loaded; get_files() would wrap each entry in a File
+        # object just to read its name.
+        replacing = any(f.get("name") == remote_name for f in item.files)
     except Exception:
         replacing = False
     print(f"{'Replacing' if replacing else 'Creating'} {remote_name} in {identifier}\n")
@@ -308,10 +367,61 @@ def main() -> None:
         for r in result:
             if not getattr(r, "ok", False):
                 print(r)
-        sys.exit(1)
+        raise SystemExit(f"Internet Archive upload failed for {identifier}")
+
+    return f"https://archive.org/download/{identifier}/{remote_name}"
+
+
+def upload_many(
+    mp3_paths: Sequence[pathlib.Path], *, max_workers: int | None = None
+) -> list[tuple[pathlib.Path, str | BaseException]]:
+    """Upload several MP3s concurrently, one IA item per episode.
+
+    Inputs: MP3 paths (each with its sidecar); worker count, defaulting to the
+    IA_PARALLEL env var (6).
+    Outputs: (path, download URL or the raised exception) pairs in input order.
+    Edge cases: one failed upload (including run()'s SystemExit, or a failure to
+    build the IA session) does not cancel the others. Each worker builds its own IA
+    session inside the pool, at most max_workers of them, because requests
+    sessions are not guaranteed to be thread-safe.
+    """
+    if max_workers is None:
+        try:
+            max_workers = int(os.getenv("IA_PARALLEL", str(DEFAULT_IA_PARALLEL)))
+        except ValueError:
+            max_workers = DEFAULT_IA_PARALLEL
+    max_workers = max(1, min(max_workers, len(mp3_paths) or 1))
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="ia-upload"
+    ) as pool:
+        futures = [pool.submit(_run_in_worker, path) for path in mp3_paths]
+    results: list[tuple[pathlib.Path, str | BaseException]] = []
+    for path, future in zip(mp3_paths, futures):
+        exc = future.exception()
+        results.append((path, exc if exc is not None else future.result()))
+    return results
 
-    url = f"https://archive.org/download/{identifier}/{remote_name}"
-    print("OK:", url)
+
+def main() -> None:
+    """CLI entry point for uploading generated MP3s by hand."""
+    if len(sys.argv) < 2:
+        print("Usage: python upload_to_ia.py path/to/file.mp3 [more.mp3 ...]")
+        sys.exit(2)
+
+    if len(sys.argv) == 2:
+        url = run(pathlib.Path(sys.argv[1]))
+        print("OK:", url)
+        return
+
+    failed = 0
+    for path, outcome in upload_many([pathlib.Path(arg) for arg in sys.argv[1:]]):
+        if isinstance(outcome, BaseException):
+            failed += 1
+            print(f"FAILED: {path}: {outcome}")
+        else:
+            print("OK:", outcome)
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -7,18 +7,20 @@ import datetime
 import email.utils
 import hashlib
 import html
-import json
 import os
 import pathlib
+import re
 import sys
-from typing import NotRequired, Protocol, TypedDict, cast
-from urllib.parse import urlsplit
+from collections.abc import Mapping, Sequence
+from typing import Any, NotRequired, Protocol, TypedDict, cast
 from zoneinfo import ZoneInfo
 
 import requests
 from defusedxml import ElementTree as ET
 from feedgen.feed import FeedGenerator
 
+import json_utils
+
 
 class ChannelMeta(TypedDict):
     """Minimal description of the entire podcast channel."""
@@ -43,6 +45,7 @@ class EpisodePayload(TypedDict):
     article_subtitle: NotRequired[str]
     article_link: NotRequired[str]
     article_image_url: NotRequired[str]
+    audio_bytes: NotRequired[int]
 
 
 class ExistingFeedItem(TypedDict):
@@ -111,7 +114,17 @@ class FeedGeneratorProtocol(Protocol):
     def add_entry(self) -> FeedEntryProtocol: ...
 
 
+StrPath = str | os.PathLike[str]
+
 ITUNES_NS = "{http://www.itunes.com/dtds/podcast-1.0.dtd}"
+# Timezone used for item pubDate values.
+FEED_TZ = ZoneInfo("Asia/Jerusalem")
+# http(s) URL whose path (before any query/fragment) ends in .jpg or .png; the
+# optional //authority (possessive, never re-read as path) stops at the first /, ?
+# or # just like urlsplit.
+_ITUNES_IMAGE_RE = re.compile(
+    r"https?:(?://[^/?#]*)?+[^?#]*\.(?:jpg|png)(?:[?#]|\Z)", re.IGNORECASE
+)
 
 
 def _create_feed_generator() -> FeedGeneratorProtocol:
@@ -170,12 +183,7 @@ def ensure_base_feed(
 
 def _valid_itunes_image(url: str | None) -> bool:
     """Validate episode images so podcast apps do not reject the feed."""
-    if not url:
-        return False
-    parsed = urlsplit(url)
-    if parsed.scheme not in {"http", "https"}:
-        return False
-    return parsed.path.lower().endswith((".jpg", ".png"))
+    return bool(url and _ITUNES_IMAGE_RE.match(url.lstrip()))
 
 
 def _build_episode_guid(episode_payload: EpisodePayload) -> str:
@@ -215,7 +223,7 @@ def _existing_item_matches_episode(
     try:
         pub_date = datetime.datetime.fromisoformat(
             episode_payload["article_pub_utc"]
-        ).astimezone(ZoneInfo("Asia/Jerusalem"))
+        ).astimezone(FEED_TZ)
         expected_pub_date = rfc2822(pub_date)
     except Exception:
         expected_pub_date = ""
@@ -231,6 +239,22 @@ def add_item(
     feed_path: str, channel_meta: ChannelMeta, ep: EpisodePayload, keep_last: int = 200
 ) -> None:
     """Append the episode described by ``ep`` and trim the feed to ``keep_last`` items."""
+    add_items(feed_path, channel_meta, [ep], keep_last=keep_last)
+
+
+def add_items(
+    feed_path: str,
+    channel_meta: ChannelMeta,
+    episodes: Sequence[EpisodePayload],
+    keep_last: int = 200,
+) -> None:
+    """Append several episodes with one feed parse and one write.
+
+    Inputs: feed path, channel metadata, episode payloads in the order to add them.
+    Outputs: None; the feed file is rewritten once.
+    Edge cases: existing items matching any new episode are replaced; the existing
+    items kept shrink as the batch grows so the feed size matches one add_item call.
+    """
     items: list[ExistingFeedItem] = []
     if os.path.exists(feed_path):
         tree = ET.parse(feed_path)
@@ -281,13 +305,14 @@ def add_item(
 
     channel_has_image = bool(channel_meta.get("image"))
 
-    unique_existing_items: list[ExistingFeedItem] = []
-    for existing_item in items:
-        if _existing_item_matches_episode(existing_item, ep):
-            continue
-        unique_existing_items.append(existing_item)
+    unique_existing_items = [
+        existing_item
+        for existing_item in items
+        if not any(_existing_item_matches_episode(existing_item, ep) for ep in episodes)
+    ]
 
-    for existing_item in unique_existing_items[:keep_last]:
+    keep_existing = max(0, keep_last + 1 - len(episodes))
+    for existing_item in unique_existing_items[:keep_existing]:
         fe = fg.add_entry()
         fe.title(existing_item["title"])
         fe.description(existing_item["description"])
@@ -301,9 +326,21 @@ def add_item(
             )
         if existing_item["guid"]:
             fe.guid(existing_item["guid"], permalink=False)
-        if not channel_has_image and _valid_itunes_image(existing_item["image_url"]):
+        # image_url was validated (or blanked) when the existing feed was parsed.
+        if not channel_has_image and existing_item["image_url"]:
             fe.podcast.itunes_image(existing_item["image_url"])
 
+    for ep in episodes:
+        _add_episode_entry(fg, ep, channel_has_image=channel_has_image)
+
+    pathlib.Path(feed_path).parent.mkdir(parents=True, exist_ok=True)
+    fg.rss_file(feed_path, pretty=True)
+
+
+def _add_episode_entry(
+    fg: FeedGeneratorProtocol, ep: EpisodePayload, *, channel_has_image: bool
+) -> None:
+    """Add one new episode entry (description, pubDate, enclosure, guid) to fg."""
     fe = fg.add_entry()
     fe.title(ep["article_title"])
     full_desc_html = ep.get("article_summary_html") or ""
@@ -330,10 +367,12 @@ def add_item(
     try:
         pub_dt = datetime.datetime.fromisoformat(ep["article_pub_utc"])
     except Exception:
-        pub_dt = datetime.datetime.now(ZoneInfo("Asia/Jerusalem"))
-    fe.pubDate(rfc2822(pub_dt.astimezone(ZoneInfo("Asia/Jerusalem"))))
+        pub_dt = datetime.datetime.now(FEED_TZ)
+    fe.pubDate(rfc2822(pub_dt.astimezone(FEED_TZ)))
 
-    size = get_len(ep["audio_url"]) or 0
+    # The uploaded MP3 is immutable, so the size recorded at generation time is
+    # exact; the HEAD is only needed for payloads that predate audio_bytes.
+    size = ep.get("audio_bytes") or get_len(ep["audio_url"]) or 0
     fe.enclosure(ep["audio_url"], str(size), "audio/mpeg")
     fe.guid(_build_episode_guid(ep), permalink=False)
     if not channel_has_image:
@@ -341,9 +380,6 @@ def add_item(
         if _valid_itunes_image(episode_img):
             fe.podcast.itunes_image(episode_img)
 
-    pathlib.Path(feed_path).parent.mkdir(parents=True, exist_ok=True)
-    fg.rss_file(feed_path, pretty=True)
-
 
 def resolve_feed_path() -> str:
     """Figure out where to write the RSS file based on environment variables."""
@@ -354,20 +390,42 @@ def resolve_feed_path() -> str:
     return os.path.join("./public", fname)
 
 
-def main() -> None:
-    """CLI entry point invoked after each upload to refresh the RSS feed."""
-    if len(sys.argv) < 3:
-        print("Usage: python write_rss.py <audio_url> <sidecar_json_path>")
-        sys.exit(2)
+def _load_episode(
+    audio_url: str, sidecar: StrPath | Mapping[str, Any]
+) -> EpisodePayload:
+    """Return a fresh episode payload for sidecar with audio_url filled in."""
+    if isinstance(sidecar, Mapping):
+        ep = cast(EpisodePayload, dict(sidecar))
+    else:
+        if not os.path.isfile(sidecar):
+            raise SystemExit(f"Not found: {sidecar}")
+        with open(sidecar, "rb") as f:
+            ep = cast(EpisodePayload, json_utils.loads(f.read()))
+    ep["audio_url"] = audio_url
+    return ep
 
-    audio_url = sys.argv[1]
-    sidecar = sys.argv[2]
-    if not os.path.isfile(sidecar):
-        sys.exit(f"Not found: {sidecar}")
 
-    with open(sidecar, "r", encoding="utf-8") as f:
-        ep = cast(EpisodePayload, json.load(f))
-    ep["audio_url"] = audio_url
+def run(audio_url: str, sidecar: StrPath | Mapping[str, Any]) -> str:
+    """Add the episode described by ``sidecar`` (served from ``audio_url``) to the feed.
+
+    Inputs: public audio URL and either the path to the episode sidecar JSON or an
+    in-memory mapping with the same article_* fields.
+    Outputs: path of the RSS file that was updated.
+    Edge cases: creates the base feed on first use; raises SystemExit if the sidecar
+    is missing; mappings are copied, never mutated.
+    """
+    return run_many([(audio_url, sidecar)])
+
+
+def run_many(pairs: Sequence[tuple[str, StrPath | Mapping[str, Any]]]) -> str:
+    """Add several (audio_url, sidecar) episodes to the feed in one rewrite.
+
+    Inputs: pairs as accepted by run(), in the order to add them.
+    Outputs: path of the RSS file that was updated.
+    Edge cases: every sidecar is loaded before the feed is touched, so a missing
+    one leaves the feed unchanged.
+    """
+    episodes = [_load_episode(audio_url, sidecar) for audio_url, sidecar in pairs]
 
     feed_path = resolve_feed_path()
     channel: ChannelMeta = {
@@ -391,7 +449,21 @@ def main() -> None:
         channel["feed_url"],
     )
 
-    add_item(feed_path, channel, ep, keep_last=200)
+    add_items(feed_path, channel, episodes, keep_last=200)
+    return feed_path
+
+
+def main() -> None:
+    """CLI entry point for refreshing the RSS feed after one or more uploads."""
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        print(
+            "Usage: python write_rss.py <audio_url> <sidecar_json_path> "
+            "[<audio_url> <sidecar_json_path> ...]"
+        )
+        sys.exit(2)
+
+    feed_path = run_many(list(zip(args[::2], args[1::2])))
     print(f"Updated: {feed_path}")
 
 